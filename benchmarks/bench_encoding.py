@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Wire encoding benchmark
+Compares encode/decode CPU time and bytes on the wire for JSON,
+MessagePack and CBOR using records produced by LXPProtocol.format_data
+"""
+
+import argparse
+import gzip
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.protocols.lxp_protocol import LXPProtocol
+from src.protocols.encoding import CODECS, get_codec
+
+DEVICE_INFO = {
+    'device_id': 'bench-device-0001',
+    'type': 'coating_machine',
+    'firmware_version': '1.0.0',
+    'hardware_version': '1.0.0'
+}
+
+def make_raw_data(rng: random.Random) -> dict:
+    """Build a raw sample shaped like DataCollector.collect_all output"""
+    thresholds = {'warning_low': 15, 'warning_high': 35, 'critical_low': 10, 'critical_high': 40}
+    return {
+        'sensors': {
+            'temperature': {'value': 20 + rng.uniform(0, 10), 'unit': '°C', 'accuracy': 0.1,
+                            'status': 'normal', 'thresholds': thresholds},
+            'humidity': {'value': 40 + rng.uniform(0, 20), 'unit': '%', 'accuracy': 0.5,
+                         'status': 'normal', 'thresholds': {}},
+            'pressure': {'value': 1013 + rng.uniform(-10, 10), 'unit': 'hPa', 'accuracy': 1.0,
+                         'status': 'normal', 'thresholds': {}}
+        },
+        'metrics': {
+            'cpu_usage': {'value': rng.uniform(0, 100), 'unit': '%', 'status': 'normal'},
+            'memory_usage': {'value': rng.uniform(0, 100), 'unit': '%', 'status': 'normal'},
+            'disk_usage': {'value': 42.0, 'unit': '%', 'status': 'normal'}
+        },
+        'alarms': [],
+        'location': {'latitude': 41.0082, 'longitude': 28.9784, 'altitude': 100},
+        'environment': {'ambient_temperature': 22.0, 'ambient_humidity': 45.0},
+        'network': {'hostname': 'gateway-01', 'ip_address': '10.0.0.12',
+                    'connection_type': 'ethernet', 'signal_strength': -45}
+    }
+
+def make_records(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    protocol = LXPProtocol()
+    return [protocol.format_data(make_raw_data(rng), DEVICE_INFO) for _ in range(count)]
+
+def bench_codec(codec, records: list, rounds: int) -> dict:
+    encoded = [codec.encode(record) for record in records]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for record in records:
+            codec.encode(record)
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for data in encoded:
+            codec.decode(data)
+    decode_time = time.perf_counter() - start
+
+    operations = rounds * len(records)
+    batch_body = codec.encode_records_body({'api_key': 'x' * 32, 'mode': 'batch'}, encoded)
+    return {
+        'encode_us': encode_time / operations * 1e6,
+        'decode_us': decode_time / operations * 1e6,
+        'record_bytes': sum(len(data) for data in encoded) / len(encoded),
+        'batch_bytes': len(batch_body),
+        'batch_gzip_bytes': len(gzip.compress(batch_body))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="LXP wire encoding benchmark")
+    parser.add_argument('--records', type=int, default=100, help="records per batch")
+    parser.add_argument('--rounds', type=int, default=50, help="timing rounds")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+
+    print(f"{'codec':<10}{'encode us':>12}{'decode us':>12}{'bytes/rec':>12}"
+          f"{'batch B':>10}{'gzip B':>10}")
+    for name in CODECS:
+        codec = get_codec(name)
+        if codec is None:
+            print(f"{name:<10}  (library not installed)")
+            continue
+        result = bench_codec(codec, records, args.rounds)
+        print(f"{name:<10}{result['encode_us']:>12.1f}{result['decode_us']:>12.1f}"
+              f"{result['record_bytes']:>12.0f}{result['batch_bytes']:>10}"
+              f"{result['batch_gzip_bytes']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+LXP formatting benchmark
+Compares records per second of the original formatter (see
+reference_formatter.py), LXPProtocol.format_data and the compiled
+formatter, one record at a time and as a batch. Every variant is warmed
+up and then timed over several repeats, interleaved across variants and
+with the garbage collector off; the median repeat is reported so neither
+the run order nor a noisy moment skews results
+"""
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.protocols.lxp_protocol import LXPProtocol
+from bench_encoding import DEVICE_INFO, make_raw_data
+from reference_formatter import ReferenceLXPProtocol
+
+def time_round(format_all, samples: list, rounds: int) -> float:
+    """Records per second over `rounds` rounds with the garbage collector off"""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            format_all(samples)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return rounds * len(samples) / elapsed
+
+def bench(variants: list, samples: list, rounds: int, repeats: int, warmup: int) -> dict:
+    """Median and best records/s per variant, with repeats interleaved across variants"""
+    for _ in range(warmup):
+        for _, format_all in variants:
+            format_all(samples)
+
+    rates = {name: [] for name, _ in variants}
+    for _ in range(repeats):
+        for name, format_all in variants:
+            rates[name].append(time_round(format_all, samples, rounds))
+
+    return {name: {'median': statistics.median(values), 'best': max(values)}
+            for name, values in rates.items()}
+
+def make_samples(count: int) -> list:
+    """Raw samples stamped one second apart, like DataCollector.collect_all output"""
+    rng = random.Random(1)
+    start = time.time() - count
+    return [dict(make_raw_data(rng), timestamp=start + index) for index in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="LXP formatting benchmark")
+    parser.add_argument('--records', type=int, default=1000, help="samples per round")
+    parser.add_argument('--rounds', type=int, default=5, help="rounds per timed repeat")
+    parser.add_argument('--repeats', type=int, default=7, help="timed repeats per variant")
+    parser.add_argument('--warmup', type=int, default=2, help="untimed rounds per variant")
+    args = parser.parse_args()
+
+    samples = make_samples(args.records)
+    reference = ReferenceLXPProtocol()
+    protocol = LXPProtocol()
+    formatter = protocol.compile(DEVICE_INFO)
+
+    variants = [
+        ('reference', lambda batch: [reference.format_data(raw, DEVICE_INFO) for raw in batch]),
+        ('format_data', lambda batch: [protocol.format_data(raw, DEVICE_INFO) for raw in batch]),
+        ('compiled', lambda batch: [formatter.format(raw) for raw in batch]),
+        ('format_batch', formatter.format_batch)
+    ]
+
+    results = bench(variants, samples, args.rounds, args.repeats, args.warmup)
+    baseline = results['reference']['median']
+    print(f"{'variant':<14}{'median rec/s':>14}{'best rec/s':>14}{'speedup':>10}")
+    for name, result in results.items():
+        print(f"{name:<14}{result['median']:>14,.0f}{result['best']:>14,.0f}"
+              f"{result['median'] / baseline:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
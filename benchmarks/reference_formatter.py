@@ -0,0 +1,127 @@
+"""
+Reference LXP formatter
+A frozen copy of LXPProtocol.format_data as it was before the compiled
+formatter and the timestamp changes, kept so the formatting benchmarks
+measure against the original code rather than the current one.
+Benchmark use only; do not import from the agent
+"""
+
+from datetime import datetime
+from typing import Dict, Any
+import uuid
+
+class ReferenceLXPProtocol:
+    """Original LXPProtocol formatting path"""
+
+    def __init__(self, version: str = "1.0"):
+        self.version = version
+        self.required_fields = [
+            'lxp_version', 'device_info', 'timestamp', 'data'
+        ]
+
+    def format_data(self, raw_data: Dict[str, Any], device_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Format raw sensor data into LXPCloud protocol format"""
+        try:
+            formatted_data = {
+                "lxp_version": self.version,
+                "device_info": self._format_device_info(device_info),
+                "timestamp": self._format_timestamp(),
+                "data": self._format_sensor_data(raw_data),
+                "metadata": self._format_metadata(raw_data)
+            }
+
+            self._validate_data(formatted_data)
+
+            return formatted_data
+
+        except Exception as e:
+            raise ValueError(f"Data formatting failed: {e}")
+
+    def _format_device_info(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "device_id": device_info.get('device_id', str(uuid.uuid4())),
+            "device_type": device_info.get('type', 'unknown'),
+            "firmware_version": device_info.get('firmware_version', '1.0.0'),
+            "hardware_version": device_info.get('hardware_version', '1.0.0')
+        }
+
+    def _format_timestamp(self) -> Dict[str, Any]:
+        # utcnow() as in the original; deprecated on Python 3.12+
+        now = datetime.utcnow()
+        return {
+            "unix": int(now.timestamp()),
+            "iso": now.isoformat() + "Z",
+            "timezone": "UTC"
+        }
+
+    def _format_sensor_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        formatted = {
+            "sensors": {},
+            "metrics": {},
+            "alarms": [],
+            "status": {
+                "operational": True,
+                "maintenance_required": False,
+                "last_maintenance": None
+            }
+        }
+
+        for sensor_name, sensor_data in raw_data.get('sensors', {}).items():
+            formatted["sensors"][sensor_name] = {
+                "value": sensor_data.get('value', 0),
+                "unit": sensor_data.get('unit', ''),
+                "accuracy": sensor_data.get('accuracy', 0),
+                "status": self._determine_status(sensor_data)
+            }
+
+        for metric_name, metric_data in raw_data.get('metrics', {}).items():
+            formatted["metrics"][metric_name] = {
+                "value": metric_data.get('value', 0),
+                "unit": metric_data.get('unit', ''),
+                "status": self._determine_status(metric_data)
+            }
+
+        for alarm in raw_data.get('alarms', []):
+            formatted["alarms"].append({
+                "id": alarm.get('id', 'UNKNOWN'),
+                "severity": alarm.get('severity', 'info'),
+                "message": alarm.get('message', ''),
+                "timestamp": int(datetime.utcnow().timestamp())
+            })
+
+        return formatted
+
+    def _format_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "location": raw_data.get('location', {}),
+            "environment": raw_data.get('environment', {}),
+            "network": raw_data.get('network', {})
+        }
+
+    def _determine_status(self, data: Dict[str, Any]) -> str:
+        value = data.get('value', 0)
+        thresholds = data.get('thresholds', {})
+
+        if 'critical_high' in thresholds and value > thresholds['critical_high']:
+            return 'critical'
+        elif 'warning_high' in thresholds and value > thresholds['warning_high']:
+            return 'warning'
+        elif 'warning_low' in thresholds and value < thresholds['warning_low']:
+            return 'warning'
+        elif 'critical_low' in thresholds and value < thresholds['critical_low']:
+            return 'critical'
+        else:
+            return 'normal'
+
+    def _validate_data(self, data: Dict[str, Any]):
+        for field in self.required_fields:
+            if field not in data:
+                raise ValueError(f"Missing required field: {field}")
+
+        device_info = data.get('device_info', {})
+        if not device_info.get('device_id'):
+            raise ValueError("Device ID is required")
+
+        timestamp = data.get('timestamp', {})
+        if not timestamp.get('unix') or not timestamp.get('iso'):
+            raise ValueError("Invalid timestamp format")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark suite
+Measures the collect -> format -> serialize -> send stages with simulated
+sensors and a local stub server, so it runs on any machine without
+hardware or network access. Results can be saved as a baseline and later
+runs are compared against it
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.core.connection import LXPConnection
+from src.core.data_collector import DataCollector
+from src.core.data_sender import DataSender
+from src.protocols.lxp_protocol import LXPProtocol
+from src.protocols.encoding import JSONCodec
+from src.tools.stub_server import StubServer
+from reference_formatter import ReferenceLXPProtocol
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+DEVICE_INFO = {
+    'device_id': 'bench-device-0001',
+    'type': 'coating_machine',
+    'firmware_version': '1.0.0',
+    'hardware_version': '1.0.0'
+}
+
+# Without the DHT/BMP280 libraries these sensors fall back to simulated values
+SENSOR_CONFIG = {
+    'temperature': {'enabled': True, 'type': 'temperature', 'pin': 18,
+                    'thresholds': {'warning_low': 15, 'warning_high': 35,
+                                   'critical_low': 10, 'critical_high': 40}},
+    'humidity': {'enabled': True, 'type': 'humidity', 'pin': 19,
+                 'thresholds': {'warning_low': 30, 'warning_high': 70}},
+    'pressure': {'enabled': True, 'type': 'pressure', 'pin': 20}
+}
+
+# Metrics where a higher value is a regression; all others regress downwards.
+# Every metric is per record or per request so it does not scale with the
+# run size, but latencies still depend on it; see comparable_args()
+HIGHER_IS_WORSE = ('p50_ms', 'p99_ms', 'alloc_bytes_per_record', 'bytes_per_record')
+
+# Formatting takes microseconds per record, so it is warmed up and timed
+# over several interleaved repeats with the garbage collector off
+FORMAT_WARMUP = 1
+FORMAT_REPEATS = 5
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(latencies: list, records: int, elapsed: float) -> dict:
+    """records/s and latency percentiles (latencies in seconds)"""
+    return {
+        'records_per_s': records / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000
+    }
+
+def settle():
+    """Collect garbage left by the previous stage so it is not timed here"""
+    gc.collect()
+
+def traced_peak_per_record(func, records: int) -> float:
+    """Peak memory allocated while running func, in bytes per record"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / max(1, records)
+
+async def bench_collect(count: int) -> tuple:
+    """DataCollector.collect_all with simulated sensors; returns (result, samples)"""
+    collector = DataCollector(SENSOR_CONFIG)
+    samples = []
+    latencies = []
+
+    settle()
+    start = time.perf_counter()
+    for _ in range(count):
+        began = time.perf_counter()
+        samples.append(await collector.collect_all())
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+
+    await collector.metadata.close()
+    return summarize(latencies, count, elapsed), samples
+
+def time_format_pass(format_one, samples: list) -> tuple:
+    """One timed pass with the garbage collector off; returns (elapsed, latencies)"""
+    latencies = []
+    settle()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for raw in samples:
+            began = time.perf_counter()
+            format_one(raw)
+            latencies.append(time.perf_counter() - began)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return elapsed, latencies
+
+def bench_format(samples: list) -> tuple:
+    """
+    The original formatter, LXPProtocol.format_data and the compiled formatter
+    Repeats are interleaved across variants and the median pass is reported,
+    so neither run order nor a noisy moment favours one; returns (results, records)
+    """
+    reference = ReferenceLXPProtocol()
+    protocol = LXPProtocol()
+    formatter = protocol.compile(DEVICE_INFO)
+    variants = (
+        ('format_reference', lambda raw: reference.format_data(raw, DEVICE_INFO)),
+        ('format_data', lambda raw: protocol.format_data(raw, DEVICE_INFO)),
+        ('format_compiled', formatter.format)
+    )
+
+    for _ in range(FORMAT_WARMUP):
+        for _, format_one in variants:
+            [format_one(raw) for raw in samples]
+
+    passes = {name: [] for name, _ in variants}
+    for _ in range(FORMAT_REPEATS):
+        for name, format_one in variants:
+            passes[name].append(time_format_pass(format_one, samples))
+
+    results = {}
+    for name, format_one in variants:
+        ordered = sorted(passes[name], key=lambda timed: timed[0])
+        elapsed, latencies = ordered[len(ordered) // 2]
+        result = summarize(latencies, len(samples), elapsed)
+        result['alloc_bytes_per_record'] = traced_peak_per_record(
+            lambda: [format_one(raw) for raw in samples], len(samples)
+        )
+        results[name] = result
+
+    # Later stages serialize and send what the agent sends
+    return results, [formatter.format(raw) for raw in samples]
+
+def bench_serialize(records: list) -> dict:
+    """JSON encoding of single records"""
+    codec = JSONCodec()
+    latencies = []
+    total_bytes = 0
+
+    settle()
+    start = time.perf_counter()
+    for record in records:
+        began = time.perf_counter()
+        total_bytes += len(codec.encode(record))
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+
+    result = summarize(latencies, len(records), elapsed)
+    result['bytes_per_record'] = total_bytes / len(records)
+    result['alloc_bytes_per_record'] = traced_peak_per_record(
+        lambda: [codec.encode(record) for record in records], len(records)
+    )
+    return result
+
+async def bench_send(records: list, batch_size: int, compression: bool,
+                     faults: dict = None) -> dict:
+    """DataSender.send_batch through LXPConnection against the stub server"""
+    server = StubServer(port=0, faults=faults, seed=1)
+    await server.start()
+    connection = LXPConnection({
+        'base_url': server.url,
+        'endpoint': '/machine.php',
+        'api_key': 'bench_api_key_0001',
+        'batch_mode': True,
+        'batch_size': batch_size
+    }, compression)
+    # Retries only matter when faults are injected
+    sender = DataSender(connection, {
+        'max_attempts': 3 if faults else 1,
+        'base_delay': 0.01,
+        'failure_threshold': 1000
+    })
+
+    latencies = []
+    sent = 0
+    try:
+        await connection.test_connection()
+        settle()
+        start = time.perf_counter()
+        for offset in range(0, len(records), batch_size):
+            began = time.perf_counter()
+            result = await sender.send_batch(records[offset:offset + batch_size])
+            latencies.append(time.perf_counter() - began)
+            sent += result['successful']
+        elapsed = time.perf_counter() - start
+    finally:
+        await connection.close()
+        await server.stop()
+
+    stats = server.get_stats()
+    result = summarize(latencies, sent, elapsed)
+    result['bytes_per_record'] = stats['bytes_received'] / max(1, sent)
+    # Retried requests lower this; fewer records per request is a regression
+    result['records_per_request'] = sent / max(1, stats['requests'] - stats['probes'])
+    if faults:
+        result['delivered_ratio'] = sent / len(records)
+    return result
+
+async def run_suite(args) -> dict:
+    results = {}
+    results['collect'], samples = await bench_collect(args.samples)
+    format_results, records = bench_format(samples)
+    results.update(format_results)
+    results['serialize_json'] = bench_serialize(records)
+    results['send_batch'] = await bench_send(records, args.batch_size, False)
+    results['send_batch_gzip'] = await bench_send(records, args.batch_size, True)
+    results['send_batch_faults'] = await bench_send(records, args.batch_size, True, {
+        'latency': 0.002,
+        'error_rate': 0.05,
+        'reset_rate': 0.02
+    })
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print results next to the baseline; return the regressed metrics"""
+    regressions = []
+    print(f"{'stage':<18}{'metric':<24}{'value':>14}{'baseline':>14}{'change':>10}")
+    for stage, metrics in results.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(stage, {}).get(metric)
+            line = f"{stage:<18}{metric:<24}{value:>14.2f}"
+            if isinstance(reference, (int, float)) and reference:
+                change = (value - reference) / reference
+                worse = change > tolerance if metric in HIGHER_IS_WORSE else change < -tolerance
+                line += f"{reference:>14.2f}{change:>+9.0%}{' !' if worse else ''}"
+                if worse:
+                    regressions.append(f"{stage}.{metric}")
+            print(line)
+    return regressions
+
+def comparable_args(args) -> dict:
+    """Run parameters that must match for results to be comparable"""
+    return {'samples': args.samples, 'batch_size': args.batch_size}
+
+def main():
+    parser = argparse.ArgumentParser(description="LXP agent pipeline benchmarks")
+    parser.add_argument('--samples', type=int, default=2000,
+                        help="collect_all calls; every later stage uses these samples")
+    parser.add_argument('--batch-size', type=int, default=50, help="records per send_batch call")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline results file")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="relative change that counts as a regression")
+    parser.add_argument('--check', action='store_true',
+                        help="exit with status 1 when a metric regressed")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored.get('args') == comparable_args(args):
+            baseline = stored.get('results', {})
+        else:
+            message = (f"Baseline was recorded with {stored.get('args')}, "
+                       f"this run used {comparable_args(args)}; not comparing")
+            if args.check:
+                print(message)
+                sys.exit(2)
+            print(f"{message}\n")
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'args': comparable_args(args),
+                'results': results
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
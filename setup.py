@@ -34,6 +34,7 @@ setup(
         "requests>=2.28.0",
         "pydantic>=1.10.0",
         "python-dotenv>=0.19.0",
+        "psutil>=5.8.0",
     ],
     extras_require={
         "raspberry_pi": [
@@ -47,6 +48,16 @@ setup(
         "esp32": [
             "pyserial>=3.5",
         ],
+        "compression": [
+            "zstandard>=0.19.0",
+        ],
+        "binary": [
+            "msgpack>=1.0.0",
+            "cbor2>=5.4.0",
+        ],
+        "aggregation": [
+            "numpy>=1.21.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.21.0",
@@ -57,6 +68,7 @@ setup(
     entry_points={
         "console_scripts": [
             "lxpcloud-agent=lxpcloud_device_agent.cli:main",
+            "lxpcloud-stub-server=lxpcloud_device_agent.tools.stub_server:main",
         ],
     },
 ) 
\ No newline at end of file
@@ -23,10 +23,8 @@ from .hardware.gpio_manager import GPIOManager
 from .hardware.i2c_manager import I2CManager
 
 # Import platform implementations
-from .platforms.raspberry_pi import RaspberryPiPlatform
-from .platforms.arduino import ArduinoPlatform
-from .platforms.esp32 import ESP32Platform
-from .platforms.generic import GenericPlatform
+# RaspberryPiPlatform is None when the Raspberry Pi libraries are missing
+from .platforms import RaspberryPiPlatform, ArduinoPlatform, ESP32Platform, GenericPlatform
 
 # Import utilities
 from .utils.logger import setup_logger
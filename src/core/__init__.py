@@ -3,8 +3,17 @@ Core components for LXPCloud Device Agent
 """
 
 from .agent import LXPCloudAgent
+from .aggregator import WindowAggregator
+from .alarm_engine import AlarmEngine
+from .alarm_lane import AlarmLane
 from .connection import LXPConnection
 from .data_collector import DataCollector
 from .data_sender import DataSender
+from .deadband import DeadbandFilter
+from .metadata import MetadataProvider
+from .storage import PersistentQueue
+from .system_metrics import SystemMetricsSampler
 
-__all__ = ['LXPCloudAgent', 'LXPConnection', 'DataCollector', 'DataSender'] 
\ No newline at end of file
+__all__ = ['LXPCloudAgent', 'LXPConnection', 'DataCollector', 'DataSender',
+           'AlarmEngine', 'AlarmLane', 'DeadbandFilter', 'MetadataProvider',
+           'PersistentQueue', 'SystemMetricsSampler', 'WindowAggregator']
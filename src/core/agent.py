@@ -5,12 +5,28 @@ from datetime import datetime
 import json
 import signal
 import sys
+import time
 
+from .aggregator import WindowAggregator
+from .alarm_lane import AlarmLane
 from .connection import LXPConnection
 from .data_collector import DataCollector
 from .data_sender import DataSender
+from .deadband import DeadbandFilter
+from .flush_policy import FlushPolicy
+from .metadata import MetadataProvider
+from .pipeline import BoundedQueue
+from .scheduler import SamplingScheduler
+from .storage import PersistentQueue
+from .system_metrics import SystemMetricsSampler
+from ..hardware.driver_executor import shutdown_driver_executor
 from ..protocols.lxp_protocol import LXPProtocol
 from ..utils.logger import setup_logger
+from ..utils.metrics import REGISTRY, MetricsServer
+from ..utils.tracing import (
+    Tracer, RecordingTracer, RingBufferExporter, FileExporter,
+    set_tracer, install_dump_signal, span
+)
 
 class LXPCloudAgent:
     """
@@ -23,99 +39,429 @@ class LXPCloudAgent:
         self.logger = setup_logger(self.config['logging'])
         
         # Initialize components
-        self.connection = LXPConnection(self.config['api'])
-        self.data_collector = DataCollector(self.config['sensors'])
-        self.data_sender = DataSender(self.connection)
+        self.connection = LXPConnection(
+            self.config['api'],
+            self.config['data_collection'].get('compression')
+        )
+        metadata_config = dict(self.config.get('metadata', {}))
+        metadata_config.setdefault('location', self.config.get('location'))
+        self.data_collector = DataCollector(
+            self.config['sensors'],
+            MetadataProvider(metadata_config),
+            SystemMetricsSampler(self.config['data_collection'].get('system_metrics', {}))
+        )
+        # One retry policy for the whole upload path; api.retry_attempts
+        # remains the default number of attempts
+        retry_config = dict(self.config.get('retry', {}))
+        retry_config.setdefault('max_attempts', self.config['api'].get('retry_attempts', 3))
+        self.data_sender = DataSender(self.connection, retry_config)
+        self.flush_policy = FlushPolicy(
+            self.config['data_collection']['batch_size'],
+            self.config['data_collection'].get('flush', {}),
+            self.connection.batch_max_records
+        )
+        self.data_sender.on_request_complete = self.flush_policy.record_result
+        self.aggregator = WindowAggregator(
+            self.config['data_collection'].get('aggregation', {})
+        )
+        self.deadband = DeadbandFilter(
+            self.config['sensors'],
+            self.config['data_collection'].get('metrics_deadband')
+        )
         self.protocol = LXPProtocol()
+        self.formatter = self.protocol.compile(self.config['device'])
+        self.alarm_lane = AlarmLane(
+            self.connection,
+            self.formatter,
+            self.config.get('alarm_lane', {}),
+            self._buffer_alarms
+        )
+        self.scheduler = SamplingScheduler(
+            self.data_collector.get_sample_periods(self.config['data_collection']['interval']),
+            self._on_overrun
+        )
         
         self.running = False
-        self.data_buffer = []
+        self.data_buffer = PersistentQueue(self.config.get('buffer', {}))
+        
+        # Stage queues are created in start() so they bind to the running loop
+        self.sample_queue = None
+        self._records_ready = None
+        self._tasks = []
+        self._stop_task = None
+        
+        # Optional local /metrics endpoint
+        metrics_config = self.config.get('metrics', {})
+        self.metrics_server = MetricsServer(metrics_config) if metrics_config.get('enabled') else None
+        self._register_metrics()
+        
+        # Optional stage spans; the default tracer records nothing
+        self.tracing_config = self.config.get('tracing', {})
+        self.trace_exporter = self._setup_tracing(self.tracing_config)
+        self._last_trace_dump = None
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
-    def _signal_handler(self, signum, frame):
+    def _signal_handler(self, signum, frame=None):
         """Handle shutdown signals"""
         self.logger.info(f"Received signal {signum}, shutting down...")
-        asyncio.create_task(self.stop())
+        self._request_stop()
+    
+    def _install_loop_signal_handlers(self):
+        """Route shutdown signals through the running loop where supported"""
+        loop = asyncio.get_event_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._signal_handler, signum)
+            except (NotImplementedError, RuntimeError):
+                # Keep the signal.signal handlers installed in __init__
+                pass
+    
+    def _request_stop(self) -> asyncio.Future:
+        """Start the shutdown sequence once; every caller gets the same task"""
+        if self._stop_task is None:
+            self._stop_task = asyncio.ensure_future(self._shutdown())
+        return self._stop_task
         
     async def start(self):
         """Start the agent"""
         self.logger.info("Starting LXPCloud Device Agent")
         self.running = True
+        self._install_loop_signal_handlers()
         
         try:
             # Test connection
             await self.connection.test_connection()
             self.logger.info("Connection test successful")
             
-            # Start data collection loop
-            await self._data_collection_loop()
+            # Collection, formatting and upload run as independent stages
+            self.sample_queue = self._create_sample_queue()
+            self._records_ready = asyncio.Event()
+            self.alarm_lane.start()
+            if self.metrics_server is not None:
+                await self.metrics_server.start()
+            self._tasks = [
+                asyncio.create_task(self._data_collection_loop()),
+                asyncio.create_task(self._formatting_loop()),
+                asyncio.create_task(self._upload_loop()),
+                asyncio.create_task(self.alarm_lane.run()),
+                asyncio.create_task(self.data_collector.system_metrics.run())
+            ]
+            if self.metrics_server is not None:
+                self._tasks.append(asyncio.create_task(self.metrics_server.monitor_loop_lag()))
+            await asyncio.gather(*self._tasks)
             
+        except asyncio.CancelledError:
+            # The stages are cancelled by our own shutdown; anything else
+            # cancelled start() itself and must propagate
+            if self._stop_task is None:
+                raise
         except Exception as e:
             self.logger.error(f"Agent startup failed: {e}")
             raise
+        
+        # Return only once the final flush is done, so asyncio.run(start())
+        # does not tear the loop down underneath it
+        if self._stop_task is not None:
+            await asyncio.shield(self._stop_task)
     
     async def stop(self):
-        """Stop the agent"""
+        """
+        Stop the agent
+        Safe to call repeatedly and from a signal: all callers wait for the
+        one shutdown sequence, which is shielded from their cancellation
+        """
+        await asyncio.shield(self._request_stop())
+    
+    async def _shutdown(self):
         self.logger.info("Stopping LXPCloud Device Agent")
         self.running = False
+        self.scheduler.stop()
+        self.data_collector.system_metrics.stop()
+        
+        for task in self._tasks:
+            task.cancel()
+        
+        # Format samples still waiting in the pipeline
+        if self.sample_queue is not None:
+            while self.sample_queue.qsize():
+                raw_data = self.sample_queue.get_nowait()
+                if self.aggregator.enabled:
+                    self.aggregator.add(raw_data)
+                else:
+                    self._store_sample(raw_data)
+        
+        # Alarms still waiting for the priority lane go out with the backlog
+        self.alarm_lane.drain()
+        
+        # Summarize the partial aggregation window
+        window = self.aggregator.close_window()
+        if window is not None:
+            self._store_sample(window)
         
         # Send remaining data
-        if self.data_buffer:
+        if len(self.data_buffer):
             await self._send_buffered_data()
         
         # Cleanup
+        shutdown_driver_executor()
+        await self.data_collector.metadata.close()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        if self.trace_exporter is not None:
+            set_tracer(Tracer())
+            self.trace_exporter.close()
+        self.data_buffer.close()
+        if self.sample_queue is not None and self.sample_queue.spill is not None:
+            self.sample_queue.spill.close()
         await self.connection.close()
     
-    async def _data_collection_loop(self):
-        """Main data collection and transmission loop"""
-        interval = self.config['data_collection']['interval']
+    def _register_metrics(self):
+        """Expose state the components already track; read only when scraped"""
+        buffer = self.data_buffer
+        REGISTRY.callback('lxp_buffer_records', "Records waiting in the upload buffer",
+                          lambda: len(buffer))
+        REGISTRY.callback('lxp_buffer_bytes', "Serialized size of the upload buffer",
+                          lambda: buffer.size_bytes)
+        REGISTRY.callback('lxp_buffer_oldest_age_seconds', "Age of the oldest buffered record",
+                          buffer.oldest_age)
+        REGISTRY.callback('lxp_sample_queue_depth', "Samples waiting to be formatted",
+                          lambda: self.sample_queue.qsize() if self.sample_queue else None)
         
-        while self.running:
-            try:
-                # Collect data
-                raw_data = await self.data_collector.collect_all()
-                
-                # Format data using LXP protocol
-                formatted_data = self.protocol.format_data(
-                    raw_data, 
-                    self.config['device']
-                )
-                
-                # Add to buffer
-                self.data_buffer.append(formatted_data)
-                
-                # Send if buffer is full or interval reached
-                if len(self.data_buffer) >= self.config['data_collection']['batch_size']:
-                    await self._send_buffered_data()
+        def dropped():
+            stats = buffer.get_stats()
+            values = {
+                ('buffer', 'evicted'): stats['evicted'],
+                ('buffer', 'rejected'): stats['rejected'],
+                ('buffer', 'dead_lettered'): stats['dead_lettered']
+            }
+            if self.sample_queue is not None:
+                values[('sample_queue', 'dropped')] = self.sample_queue.get_stats()['dropped']
+            return values
+        
+        REGISTRY.callback('lxp_records_dropped_total', "Records lost to backpressure or eviction",
+                          dropped, 'counter', ('stage', 'reason'))
+        REGISTRY.callback('lxp_sampling_overruns_total', "Sampling deadlines missed per entry",
+                          lambda: {(name,): stats['overruns']
+                                   for name, stats in self.scheduler.get_stats().items()},
+                          'counter', ('entry',))
+        REGISTRY.callback('lxp_deadband_suppressed_total', "Readings suppressed by deadband filters",
+                          lambda: self.deadband.get_stats()['suppressed'], 'counter')
+        REGISTRY.callback('lxp_circuit_open', "1 while the lane's circuit breaker is not closed",
+                          lambda: {
+                              (sender.lane,): int(sender.circuit_breaker.state != 'closed')
+                              for sender in (self.data_sender, self.alarm_lane.sender)
+                          }, 'gauge', ('lane',))
+        REGISTRY.callback('lxp_connections_total', "HTTP connections created or reused",
+                          lambda: {
+                              ('created',): self.connection.get_stats()['connections_created'],
+                              ('reused',): self.connection.get_stats()['connections_reused']
+                          }, 'counter', ('kind',))
+    
+    def _setup_tracing(self, tracing_config: Dict[str, Any]):
+        """Install a recording tracer when tracing is enabled; returns its exporter"""
+        if not tracing_config.get('enabled', False):
+            return None
+        
+        if tracing_config.get('exporter', 'ring') == 'file':
+            exporter = FileExporter(
+                tracing_config.get('path', '/var/log/lxpcloud-agent/trace.jsonl'),
+                tracing_config.get('flush_every', 100),
+                tracing_config.get('max_size', '10MB'),
+                tracing_config.get('backup_count', 1)
+            )
+        else:
+            exporter = RingBufferExporter(tracing_config.get('capacity', 2048))
+            install_dump_signal(exporter, self._trace_dump_path())
+        
+        set_tracer(RecordingTracer(exporter))
+        return exporter
+    
+    def _trace_dump_path(self) -> str:
+        return self.tracing_config.get('dump_path', '/tmp/lxpcloud-agent-trace.jsonl')
+    
+    def _on_overrun(self, name: str, lateness: float, skipped: int):
+        """Dump the span ring buffer so the slow cycle can be inspected later"""
+        if not isinstance(self.trace_exporter, RingBufferExporter):
+            return
+        if not self.tracing_config.get('dump_on_overrun', True):
+            return
+        
+        # Sustained overruns would otherwise rewrite the dump every tick
+        now = time.monotonic()
+        min_interval = self.tracing_config.get('dump_min_interval', 60)
+        if self._last_trace_dump is not None and now - self._last_trace_dump < min_interval:
+            return
+        self._last_trace_dump = now
+        
+        path = self._trace_dump_path()
+        try:
+            count = self.trace_exporter.dump(path)
+            self.logger.info(f"Overrun on {name}: dumped {count} trace spans to {path}")
+        except OSError as e:
+            self.logger.error(f"Trace dump failed: {e}")
+    
+    def _create_sample_queue(self) -> BoundedQueue:
+        """Create the queue between collection and formatting"""
+        pipeline_config = self.config.get('pipeline', {})
+        policy = pipeline_config.get('backpressure', 'drop_oldest')
+        
+        spill = None
+        if policy == 'spill':
+            spill = PersistentQueue({
+                'path': pipeline_config.get('spill_path', '/var/lib/lxpcloud-agent/spill.db'),
+                'max_size': pipeline_config.get('spill_max_size', '20MB')
+            })
+        
+        return BoundedQueue(pipeline_config.get('queue_size', 100), policy, spill)
+    
+    async def _data_collection_loop(self):
+        """Sample each sensor on its own deadline schedule"""
+        await self.scheduler.run(self._collect_due)
+    
+    async def _collect_due(self, due: list):
+        """Collect the due sensors and hand the sample to the formatting stage"""
+        try:
+            with span('cycle', due=len(due)):
+                raw_data = await self.data_collector.collect_all(due)
                 
-                await asyncio.sleep(interval)
+                # Alarm transitions bypass the pipeline through the priority lane
+                if self.alarm_lane.enabled and raw_data['alarms']:
+                    self.alarm_lane.submit(raw_data)
+                    raw_data = dict(raw_data, alarms=[])
                 
+                with span('queue.put'):
+                    await self.sample_queue.put(raw_data)
+            
+        except Exception as e:
+            self.logger.error(f"Data collection error: {e}")
+    
+    async def _formatting_loop(self):
+        """Format samples with the LXP protocol and store them for upload"""
+        while self.running:
+            if self.aggregator.enabled:
+                raw_data = await self._next_window()
+            else:
+                raw_data = await self.sample_queue.get()
+            try:
+                self._store_sample(raw_data)
+                self._records_ready.set()
             except Exception as e:
-                self.logger.error(f"Data collection error: {e}")
-                await asyncio.sleep(interval)
+                self.logger.error(f"Data formatting error: {e}")
+    
+    async def _next_window(self) -> Dict[str, Any]:
+        """Feed samples into the aggregator until its window closes"""
+        while True:
+            timeout = self.aggregator.time_until_close()
+            if timeout == 0:
+                return self.aggregator.close_window()
+            try:
+                raw_data = await asyncio.wait_for(self.sample_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                continue
+            self.aggregator.add(raw_data)
     
-    async def _send_buffered_data(self):
-        """Send buffered data to LXPCloud"""
-        if not self.data_buffer:
+    def _store_sample(self, raw_data: Dict[str, Any]):
+        """Format a raw sample and append it to the persistent buffer"""
+        raw_data = self.deadband.filter(raw_data)
+        if raw_data is None:
             return
+        
+        with span('format_data'):
+            formatted_data = self.formatter.format(raw_data)
+        
+        with span('buffer.put'):
+            stored = self.data_buffer.put(formatted_data)
+        if not stored:
+            self.logger.warning("Buffer full, record dropped")
+    
+    def _buffer_alarms(self, raw_data: Dict[str, Any]):
+        """Queue alarm events the priority lane could not deliver for normal upload"""
+        formatted_data = self.formatter.format({
+            'timestamp': raw_data.get('timestamp'),
+            'alarms': raw_data['alarms']
+        })
+        
+        if not self.data_buffer.put(formatted_data):
+            self.logger.warning("Buffer full, alarm record dropped")
+        elif self._records_ready is not None:
+            self._records_ready.set()
+    
+    async def _upload_loop(self):
+        """Upload buffered records whenever the flush policy says so"""
+        retry_delay = self.config['data_collection']['interval']
+        
+        while self.running:
+            # Sleep until new records arrive or the oldest one gets too old
+            wait = self.flush_policy.time_until_due(self.data_buffer.oldest_age())
+            try:
+                await asyncio.wait_for(self._records_ready.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            self._records_ready.clear()
+            
+            trigger = self.flush_policy.should_flush(
+                len(self.data_buffer),
+                self.data_buffer.size_bytes,
+                self.data_buffer.oldest_age()
+            )
+            if trigger is None:
+                continue
             
+            self.logger.debug(f"Flushing buffer ({trigger} limit reached)")
+            if not await self._send_buffered_data():
+                # While the circuit is open, wait for its probe window instead
+                circuit_wait = self.data_sender.circuit_breaker.retry_after()
+                await asyncio.sleep(circuit_wait or retry_delay)
+    
+    async def _send_buffered_data(self) -> bool:
+        """Send buffered data to LXPCloud; returns True if the buffer was drained"""
+        batch_size = self.flush_policy.batch_size
+        # Slow or failing links get fewer, larger requests (still byte-capped)
+        self.connection.batch_max_records = self.flush_policy.request_size
+        # Read enough records per pass to keep every in-flight slot busy
+        drain_size = max(
+            batch_size,
+            self.connection.batch_max_records * self.data_sender.max_in_flight
+        )
+        
         try:
-            # Send data in batches
-            for data in self.data_buffer:
-                success = await self.data_sender.send_data(data)
-                if success:
-                    self.logger.debug(f"Data sent successfully: {data['timestamp']['unix']}")
-                else:
-                    self.logger.warning("Failed to send data, will retry")
-                    
-            # Clear buffer on successful send
-            self.data_buffer.clear()
+            while len(self.data_buffer):
+                entries = self.data_buffer.peek(drain_size)
+                results = await self.data_sender.send_batch(
+                    [data for _, data in entries],
+                    [record_id for record_id, _ in entries]
+                )
+                
+                # Acknowledge only what the API accepted; the rest stays queued
+                sent_ids = []
+                rejected_ids = []
+                for (record_id, _), ack in zip(entries, results['results']):
+                    if ack:
+                        sent_ids.append(record_id)
+                    elif ack is False:
+                        rejected_ids.append(record_id)
+                self.data_buffer.ack(sent_ids)
+                # Rejections count towards the record's dead-letter limit
+                self.data_buffer.reject(rejected_ids)
+                self.logger.debug(f"Sent {results['successful']}/{results['total']} buffered records")
+                
+                if rejected_ids:
+                    self.logger.warning(f"API rejected {len(rejected_ids)} records")
+                undelivered = results['failed'] - results['rejected']
+                if undelivered:
+                    self.logger.warning(f"Failed to send {undelivered} records, will retry")
+                    return False
+            
+            return True
             
         except Exception as e:
             self.logger.error(f"Data transmission error: {e}")
+            return False
+        finally:
+            self.data_buffer.flush()
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from file"""
@@ -0,0 +1,161 @@
+import math
+import time
+from typing import Dict, Any, List, Optional
+
+STATUS_SEVERITY = {'normal': 0, 'stale': 1, 'error': 2, 'warning': 3, 'critical': 4}
+
+class RingBuffer:
+    """Fixed-capacity sample buffer; uses NumPy when it is installed"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        self._next = 0
+        try:
+            import numpy
+            self._np = numpy
+            self._values = numpy.empty(capacity, dtype=numpy.float64)
+        except ImportError:
+            self._np = None
+            self._values = [0.0] * capacity
+
+    def append(self, value: float):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def clear(self):
+        self.count = 0
+        self._next = 0
+
+    def summarize(self, percentiles: List[float]) -> Dict[str, float]:
+        """min/max/mean/stddev/percentiles over the buffered samples"""
+        if self._np is not None:
+            return self._summarize_numpy(percentiles)
+        return self._summarize_python(percentiles)
+
+    def _summarize_numpy(self, percentiles: List[float]) -> Dict[str, float]:
+        np = self._np
+        values = self._values[:self.count]
+        stats = {
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+            'stddev': float(values.std())
+        }
+        if percentiles:
+            for p, value in zip(percentiles, np.percentile(values, percentiles)):
+                stats[f"p{p:g}"] = float(value)
+        return stats
+
+    def _summarize_python(self, percentiles: List[float]) -> Dict[str, float]:
+        values = sorted(self._values[:self.count])
+        mean = sum(values) / len(values)
+        stats = {
+            'min': values[0],
+            'max': values[-1],
+            'mean': mean,
+            'stddev': math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+        }
+        for p in percentiles:
+            # Linear interpolation, matching numpy.percentile's default
+            rank = (len(values) - 1) * p / 100.0
+            low = int(math.floor(rank))
+            high = min(low + 1, len(values) - 1)
+            stats[f"p{p:g}"] = values[low] + (values[high] - values[low]) * (rank - low)
+        return stats
+
+class WindowAggregator:
+    """
+    Turns raw samples into per-window summary statistics
+    Sits between DataCollector and LXPProtocol: samples are added as they
+    are collected, and every `window` seconds one raw-data shaped summary
+    is produced whose sensor and metric values are the window means, with
+    the full statistics under 'stats'
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.enabled = config.get('enabled', False)
+        self.window = config.get('window', 60.0)
+        self.percentiles = config.get('percentiles', [50, 95])
+        self.capacity = config.get('capacity', 4096)
+
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._readings: Dict[str, Dict[str, Any]] = {}
+        self._alarms: List[Dict[str, Any]] = []
+        self._metadata: Dict[str, Any] = {}
+        self._window_start: Optional[float] = None
+        self._timestamp: Optional[float] = None
+
+    def add(self, raw_data: Dict[str, Any]):
+        """Add one sample as returned by DataCollector.collect_all"""
+        if self._window_start is None:
+            self._window_start = time.monotonic()
+        # The summary is stamped with the collection time of its last sample
+        self._timestamp = raw_data.get('timestamp', self._timestamp)
+
+        for group in ('sensors', 'metrics'):
+            for name, reading in raw_data.get(group, {}).items():
+                self._add_reading(f"{group}.{name}", reading)
+
+        self._alarms.extend(raw_data.get('alarms', []))
+        for key in ('location', 'environment', 'network'):
+            if raw_data.get(key):
+                self._metadata[key] = raw_data[key]
+
+    def _add_reading(self, key: str, reading: Dict[str, Any]):
+        value = reading.get('value')
+        previous = self._readings.get(key)
+
+        # Keep the latest reading's unit/accuracy and the worst status seen
+        summary = dict(reading)
+        summary.pop('thresholds', None)
+        if previous is not None and (STATUS_SEVERITY.get(previous['status'], 0) >
+                                     STATUS_SEVERITY.get(reading.get('status', 'normal'), 0)):
+            summary['status'] = previous['status']
+        summary.setdefault('status', 'normal')
+        self._readings[key] = summary
+
+        # Failed and stale reads carry placeholder values; keep them out of the stats
+        if isinstance(value, (int, float)) and summary.get('status') not in ('error', 'stale'):
+            if key not in self._buffers:
+                self._buffers[key] = RingBuffer(self.capacity)
+            self._buffers[key].append(float(value))
+
+    def time_until_close(self) -> Optional[float]:
+        """Seconds until the current window closes, or None if it is empty"""
+        if self._window_start is None:
+            return None
+        return max(0.0, self._window_start + self.window - time.monotonic())
+
+    def close_window(self) -> Optional[Dict[str, Any]]:
+        """Summarize and reset the current window; None if it is empty"""
+        if self._window_start is None:
+            return None
+
+        summary = {
+            'timestamp': self._timestamp,
+            'sensors': {},
+            'metrics': {},
+            'alarms': self._alarms,
+            'location': self._metadata.get('location', {}),
+            'environment': self._metadata.get('environment', {}),
+            'network': self._metadata.get('network', {})
+        }
+
+        for key, reading in self._readings.items():
+            group, name = key.split('.', 1)
+            buffer = self._buffers.get(key)
+            if buffer is not None and buffer.count:
+                stats = buffer.summarize(self.percentiles)
+                stats['count'] = buffer.count
+                reading['value'] = stats['mean']
+                reading['stats'] = stats
+                buffer.clear()
+            summary[group][name] = reading
+
+        self._readings = {}
+        self._alarms = []
+        self._window_start = None
+        self._timestamp = None
+        return summary
@@ -0,0 +1,124 @@
+import time
+from typing import Dict, Any, List, Optional
+
+from ..utils.thresholds import CompiledThresholds
+
+class _AlarmState:
+    """Committed and pending alarm band of one sensor"""
+
+    def __init__(self):
+        self.band: Optional[str] = None
+        self.severity = 'normal'
+        self.pending: Optional[tuple] = None  # (severity, band, since)
+
+class AlarmEngine:
+    """
+    Stateful, edge-triggered alarm evaluation
+    Each sensor's thresholds are compiled once. Every sample is matched
+    against them with a hysteresis band around the active threshold, and a
+    change must persist for min_duration seconds before it is committed.
+    Persistence is only checked when a sample arrives, so a min_duration
+    above zero delays every transition by at least one sampling period.
+    Only transitions produce events: 'raised' when a sensor enters a band
+    and 'cleared' when it leaves it
+    """
+
+    def __init__(self, sensor_config: Dict[str, Any]):
+        self._thresholds: Dict[str, CompiledThresholds] = {}
+        self._settings: Dict[str, Dict[str, float]] = {}
+        for sensor_name, config in sensor_config.items():
+            thresholds = CompiledThresholds(config.get('thresholds'))
+            if thresholds:
+                self._thresholds[sensor_name] = thresholds
+                alarm_config = config.get('alarm', {})
+                self._settings[sensor_name] = {
+                    'hysteresis': alarm_config.get('hysteresis', 0.0),
+                    'min_duration': alarm_config.get('min_duration', 0.0)
+                }
+
+        self._states: Dict[str, _AlarmState] = {}
+        self.raised = 0
+        self.cleared = 0
+
+    def evaluate(self, sensor_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Feed one sample of sensor readings; return the alarm transitions"""
+        events = []
+        now = time.monotonic()
+
+        for sensor_name, data in sensor_data.items():
+            thresholds = self._thresholds.get(sensor_name)
+            value = data.get('value')
+            # Failed and stale readings neither raise nor clear alarms
+            if (thresholds is None or data.get('status') in ('error', 'stale') or
+                    not isinstance(value, (int, float))):
+                continue
+
+            state = self._states.setdefault(sensor_name, _AlarmState())
+            settings = self._settings[sensor_name]
+            severity, band = thresholds.match(value, state.band, settings['hysteresis'])
+
+            if band == state.band:
+                state.pending = None
+                continue
+
+            # Debounce: the new band must hold for min_duration
+            if state.pending is None or state.pending[1] != band:
+                state.pending = (severity, band, now)
+            if now - state.pending[2] < settings['min_duration']:
+                continue
+
+            events.extend(self._transition(sensor_name, state, severity, band, value))
+
+        return events
+
+    def _transition(self, sensor_name: str, state: _AlarmState, severity: str,
+                    band: Optional[str], value: float) -> List[Dict[str, Any]]:
+        events = []
+        timestamp = int(time.time())
+
+        if state.band is not None:
+            self.cleared += 1
+            events.append({
+                'id': self._alarm_id(sensor_name, state.severity),
+                'severity': state.severity,
+                'state': 'cleared',
+                'message': f"{sensor_name} left {state.severity} state",
+                'value': value,
+                'timestamp': timestamp
+            })
+
+        if band is not None:
+            self.raised += 1
+            events.append({
+                'id': self._alarm_id(sensor_name, severity),
+                'severity': severity,
+                'state': 'raised',
+                'message': f"{sensor_name} is in {severity} state",
+                'value': value,
+                'timestamp': timestamp
+            })
+
+        state.band = band
+        state.severity = severity
+        state.pending = None
+        return events
+
+    @staticmethod
+    def _alarm_id(sensor_name: str, severity: str) -> str:
+        return f"{sensor_name.upper()}_{severity.upper()}"
+
+    def active_alarms(self) -> Dict[str, str]:
+        """Currently raised alarm severity per sensor"""
+        return {
+            sensor_name: state.severity
+            for sensor_name, state in self._states.items()
+            if state.band is not None
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get alarm engine statistics"""
+        return {
+            'raised': self.raised,
+            'cleared': self.cleared,
+            'active': self.active_alarms()
+        }
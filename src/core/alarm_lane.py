@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Dict, Any, Callable, Optional
+
+from .connection import LXPConnection
+from .data_sender import DataSender
+from ..protocols.lxp_protocol import CompiledFormatter
+from ..utils.metrics import REGISTRY
+
+ALARM_DELIVERY_SECONDS = REGISTRY.histogram(
+    'lxp_alarm_delivery_seconds', "Time from alarm collection to API acknowledgement"
+)
+
+# Small retry budget: alarms are few, and a stuck alarm falls back to the buffer
+DEFAULT_LANE_RETRY = {
+    'max_attempts': 3,
+    'base_delay': 0.2,
+    'max_delay': 2.0,
+    'budget_ratio': 0.5,
+    'budget_capacity': 5.0,
+    'failure_threshold': 10,
+    'reset_timeout': 10.0
+}
+
+class AlarmLane:
+    """
+    High-priority transmit lane for alarm transitions
+    Alarm events skip the sample pipeline and the upload buffer and are sent
+    immediately by their own task, with their own DataSender so retries and
+    the circuit breaker are independent of routine uploads. Events that
+    cannot be delivered are handed to `fallback` and travel with the backlog
+    """
+
+    def __init__(self, connection: LXPConnection, formatter: CompiledFormatter,
+                 config: Dict[str, Any], fallback: Callable[[Dict[str, Any]], None]):
+        self.enabled = config.get('enabled', True)
+        self.queue_size = config.get('queue_size', 100)
+        retry_config = dict(DEFAULT_LANE_RETRY)
+        retry_config.update(config.get('retry', {}))
+
+        self.sender = DataSender(connection, retry_config, lane='alarm')
+        self.formatter = formatter
+        self.fallback = fallback
+
+        # Created in start() so it binds to the running loop
+        self._queue: Optional[asyncio.Queue] = None
+
+        self.sent = 0
+        self.failed = 0
+        self.latency_last: Optional[float] = None
+        self.latency_max = 0.0
+        self._latency_total = 0.0
+
+    def start(self):
+        self._queue = asyncio.Queue(self.queue_size)
+
+    def submit(self, raw_data: Dict[str, Any]):
+        """
+        Queue a sample's alarm events
+        Only the events are sent; each carries its triggering value, and the
+        sensor readings go up once, with the sample in the main pipeline
+        """
+        item = ({
+            'timestamp': raw_data.get('timestamp'),
+            'alarms': raw_data['alarms']
+        }, time.monotonic())
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.failed += 1
+            self.fallback(item[0])
+
+    async def run(self):
+        """Send queued alarm events as soon as they arrive"""
+        while True:
+            raw_data, queued_at = await self._queue.get()
+            formatted = self.formatter.format(raw_data)
+
+            if await self.sender.send_data(formatted):
+                self._observe(time.monotonic() - queued_at)
+            else:
+                self.failed += 1
+                self.fallback(raw_data)
+
+    def drain(self):
+        """Hand events that were never sent to the fallback"""
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            raw_data, _ = self._queue.get_nowait()
+            self.fallback(raw_data)
+
+    def _observe(self, latency: float):
+        ALARM_DELIVERY_SECONDS.observe(latency)
+        self.sent += 1
+        self.latency_last = latency
+        self.latency_max = max(self.latency_max, latency)
+        self._latency_total += latency
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Delivery counts and collection-to-acknowledgement latency"""
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'pending': self._queue.qsize() if self._queue is not None else 0,
+            'latency': {
+                'last': self.latency_last,
+                'avg': self._latency_total / self.sent if self.sent else None,
+                'max': self.latency_max
+            },
+            'retry': self.sender.get_stats()
+        }
@@ -1,71 +1,389 @@
 import aiohttp
-import asyncio
-from typing import Dict, Any, Optional
+import ssl
+import time
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import logging
+
+from ..protocols.columnar import ColumnarBatchEncoder
+from ..protocols.compression import PayloadCompressor
+from ..protocols.delta import SessionDeltaEncoder
+from ..protocols.encoding import JSONCodec, available_encodings, negotiate_codec
+from ..utils.metrics import REGISTRY
+from ..utils.tracing import span
+
+logger = logging.getLogger('lxpcloud_agent')
+
+BYTES_SENT = REGISTRY.counter(
+    'lxp_upload_bytes_total', "Request body bytes sent to the API, after compression"
+)
+
+class BatchChunk:
+    """Encoded records of one device that are sent in a single request"""
+    
+    def __init__(self, device_id: str):
+        self.device_id = device_id
+        self.items: List[bytes] = []
+        self.size = 0
+        # Static sections referenced by the items (delta encoding only)
+        self.static: Dict[str, Any] = {}
+        # Columnar document replacing items (columnar batch format only)
+        self.columnar: Optional[Dict[str, Any]] = None
+        self.count = 0
+        # Durable per-record sequence numbers, in record order
+        self.sequences: List[int] = []
+    
+    def __len__(self) -> int:
+        return self.count if self.columnar is not None else len(self.items)
 
 class LXPConnection:
     """Manages connection to LXPCloud API"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], compression: Any = None):
         self.base_url = config['base_url']
         self.endpoint = config['endpoint']
         self.api_key = config['api_key']
         self.timeout = config.get('timeout', 30)
-        self.retry_attempts = config.get('retry_attempts', 3)
+        
+        # Batch wire mode: several records per request body. Only enabled
+        # once the test=1 probe confirms the server supports it, since a
+        # server ignoring mode=batch would acknowledge records it never stored
+        self.batch_requested = config.get('batch_mode', False)
+        self.batch_mode = False
+        self.batch_max_records = config.get('batch_size', 10)
+        self.batch_max_bytes = config.get('batch_max_bytes', 256 * 1024)
+        
+        # Upper bound on concurrent requests sharing the session
+        self.max_in_flight = config.get('max_in_flight', 4)
+        
+        self.compressor = PayloadCompressor(compression)
+        
+        # Wire encodings in order of preference; JSON until the server agrees
+        encoding = config.get('encoding', ['json'])
+        self.encodings = [encoding] if isinstance(encoding, str) else list(encoding)
+        self.codec = JSONCodec()
+        
+        # Batch body layout: 'records' (one document each) or 'columnar'
+        self.batch_format = config.get('batch_format', 'records')
+        if self.batch_format not in ('records', 'columnar'):
+            raise ValueError(f"Unknown batch format: {self.batch_format}")
+        self.requested_batch_format = self.batch_format
+        self.columnar = ColumnarBatchEncoder()
+        
+        # Session delta encoding of static sections (records batch format only)
+        self.delta = None
+        if config.get('delta_encoding', False) and self.batch_format == 'records':
+            self.delta = SessionDeltaEncoder()
+        
+        # Connection pool: one long-lived session with keep-alive connections
+        self.pool_size = max(config.get('pool_size', 8), self.max_in_flight)
+        self.keepalive_timeout = config.get('keepalive_timeout', 60)
+        self.dns_cache_ttl = config.get('dns_cache_ttl', 300)
+        self.idle_reconnect = config.get('idle_reconnect', 300)
+        # Built once; loading the CA bundle is expensive on small devices
+        self._ssl_context = ssl.create_default_context()
+        self._last_activity = None
+        self._pool_stats = {
+            'sessions_created': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'idle_reconnects': 0
+        }
         
         self.session = None
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout)
-        )
+        await self._get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        await self.close()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating or refreshing it as needed"""
+        now = time.monotonic()
+        
+        if self.session is not None and not self.session.closed:
+            # Pooled sockets idle this long are likely dead on cellular NATs;
+            # reconnect up front instead of waiting for a request timeout
+            if self._last_activity is not None and now - self._last_activity > self.idle_reconnect:
+                self._pool_stats['idle_reconnects'] += 1
+                await self.session.close()
+        
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
+        
+        self._last_activity = now
+        return self.session
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session with a tuned keep-alive connection pool"""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            ssl=self._ssl_context
+        )
+        self._pool_stats['sessions_created'] += 1
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace_config]
+        )
+    
+    async def _on_connection_created(self, session, context, params):
+        self._pool_stats['connections_created'] += 1
+    
+    async def _on_connection_reused(self, session, context, params):
+        self._pool_stats['connections_reused'] += 1
     
     async def test_connection(self) -> bool:
         """Test connection to LXPCloud API"""
         try:
             url = f"{self.base_url}{self.endpoint}"
             params = {'api_key': self.api_key, 'test': '1'}
+            if self.encodings != ['json']:
+                params['encodings'] = ','.join(available_encodings(self.encodings))
+            if self.batch_requested:
+                params['modes'] = f"batch,{self.requested_batch_format}"
             
-            async with self.session.get(url, params=params) as response:
+            session = await self._get_session()
+            async with session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
+                    # Servers that don't advertise encodings only accept JSON
+                    self.codec = negotiate_codec(self.encodings, data.get('encodings'))
+                    self._negotiate_modes(data.get('modes'))
                     return data.get('status') == 'ok'
                 return False
         except Exception as e:
             raise ConnectionError(f"Connection test failed: {e}")
     
-    async def send_data(self, data: Dict[str, Any]) -> bool:
-        """Send data to LXPCloud API"""
-        for attempt in range(self.retry_attempts):
-            try:
-                url = f"{self.base_url}{self.endpoint}"
-                payload = {
-                    'api_key': self.api_key,
-                    'payload': data,
-                    'recorded_at': data['timestamp']['unix']
-                }
-                
-                async with self.session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get('status') == 'ok'
-                    else:
-                        error_data = await response.json()
-                        raise Exception(f"API Error: {error_data.get('error', 'Unknown error')}")
-                        
-            except Exception as e:
-                if attempt == self.retry_attempts - 1:
-                    raise e
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-        
-        return False
+    def _negotiate_modes(self, server_modes: Optional[List[str]]):
+        """
+        Enable batch requests only if the server advertised them
+        Servers that don't advertise modes get one record per request
+        """
+        server_modes = server_modes or []
+        self.batch_mode = self.batch_requested and 'batch' in server_modes
+        if self.batch_requested and not self.batch_mode:
+            logger.warning("Server did not confirm batch support, sending one record per request")
+        
+        self.batch_format = self.requested_batch_format
+        if self.batch_mode and self.batch_format == 'columnar' and 'columnar' not in server_modes:
+            logger.warning("Server did not confirm the columnar format, using records batches")
+            self.batch_format = 'records'
+    
+    async def send_data(self, data: Dict[str, Any], sequence: Optional[int] = None) -> bool:
+        """
+        Send data to LXPCloud API in a single attempt
+        Retries are handled by DataSender
+        """
+        url = f"{self.base_url}{self.endpoint}"
+        payload = {
+            'api_key': self.api_key,
+            'payload': data,
+            'recorded_at': data['timestamp']['unix']
+        }
+        if sequence is not None:
+            payload['seq'] = sequence
+        with span('serialize', records=1):
+            body, headers = self._encode_body(self.codec.encode(payload))
+        
+        session = await self._get_session()
+        with span('http.post', bytes=len(body)):
+            async with session.post(url, data=body, headers=headers) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get('status') == 'ok'
+                else:
+                    error_data = await response.json()
+                    raise Exception(f"API Error: {error_data.get('error', 'Unknown error')}")
+    
+    def split_batch(self, records: List[Dict[str, Any]],
+                    sequences: Optional[List[int]] = None) -> List[BatchChunk]:
+        """
+        Encode records and split them into request-sized chunks
+        Each chunk holds records of a single device. `sequences` are durable
+        per-record numbers (buffer row ids); a record keeps its number when
+        it is resent, so the API can deduplicate and restore order
+        """
+        if sequences is None:
+            sequences = [None] * len(records)
+        with span('split_batch', records=len(records)):
+            if self.batch_format == 'columnar':
+                return self._split_columnar(records, sequences)
+            return self._split_records(records, sequences)
+    
+    def _split_records(self, records: List[Dict[str, Any]],
+                       sequences: List[Optional[int]]) -> List[BatchChunk]:
+        """Encode records one by one into per-device chunks"""
+        chunks = []
+        current = None
+        
+        for data, sequence in zip(records, sequences):
+            device_id = data.get('device_info', {}).get('device_id', '')
+            
+            static = {}
+            if self.delta is not None:
+                data = self.delta.encode_record(data, static)
+            
+            item = {
+                'payload': data,
+                'recorded_at': data['timestamp']['unix']
+            }
+            if sequence is not None:
+                item['seq'] = sequence
+            item = self.codec.encode(item)
+            item_bytes = len(item) + 1
+            
+            # A single oversized record still goes out on its own
+            if current is None or (current.items and (
+                    device_id != current.device_id or
+                    len(current) >= self.batch_max_records or
+                    current.size + item_bytes > self.batch_max_bytes)):
+                current = BatchChunk(device_id)
+                chunks.append(current)
+            
+            # Every chunk carries the unconfirmed sections it references,
+            # since chunks in flight together may fail independently
+            new_static = {h: section for h, section in static.items() if h not in current.static}
+            if new_static:
+                current.static.update(new_static)
+                item_bytes += len(self.codec.encode(new_static))
+            
+            current.items.append(item)
+            if sequence is not None:
+                current.sequences.append(sequence)
+            current.size += item_bytes
+        
+        return chunks
+    
+    def _split_columnar(self, records: List[Dict[str, Any]],
+                        sequences: List[Optional[int]]) -> List[BatchChunk]:
+        """Group records per device and encode each group as one columnar document"""
+        groups = []
+        for data, sequence in zip(records, sequences):
+            device_id = data.get('device_info', {}).get('device_id', '')
+            if (not groups or groups[-1][0] != device_id or
+                    len(groups[-1][1]) >= self.batch_max_records):
+                groups.append((device_id, [], []))
+            groups[-1][1].append(data)
+            if sequence is not None:
+                groups[-1][2].append(sequence)
+        
+        chunks = []
+        while groups:
+            device_id, group, group_sequences = groups.pop(0)
+            document = self.columnar.encode(group)
+            size = len(self.codec.encode(document))
+            
+            # Halve groups that exceed the byte cap until they fit
+            if size > self.batch_max_bytes and len(group) > 1:
+                middle = len(group) // 2
+                groups[0:0] = [
+                    (device_id, group[:middle], group_sequences[:middle]),
+                    (device_id, group[middle:], group_sequences[middle:])
+                ]
+                continue
+            
+            chunk = BatchChunk(device_id)
+            chunk.columnar = document
+            chunk.count = len(group)
+            chunk.sequences = group_sequences
+            chunk.size = size
+            chunks.append(chunk)
+        
+        return chunks
+    
+    async def send_batch(self, chunk: BatchChunk) -> List[Optional[bool]]:
+        """
+        Send one chunk from split_batch in a single request and attempt
+        Returns the per-record acknowledgement reported by the API
+        """
+        url = f"{self.base_url}{self.endpoint}"
+        fields = {'api_key': self.api_key, 'mode': 'batch'}
+        if chunk.sequences:
+            # Lowest record sequence; records batches also carry one per item
+            fields['seq'] = chunk.sequences[0]
+        if self.delta is not None:
+            fields['session'] = self.delta.session_id
+            if chunk.static:
+                fields['static'] = chunk.static
+        
+        with span('serialize', records=len(chunk)):
+            if chunk.columnar is not None:
+                fields['mode'] = 'columnar'
+                fields['batch'] = chunk.columnar
+                if chunk.sequences:
+                    fields['seqs'] = chunk.sequences
+                body, headers = self._encode_body(self.codec.encode(fields))
+            else:
+                body, headers = self._encode_body(self.codec.encode_records_body(fields, chunk.items))
+        
+        session = await self._get_session()
+        with span('http.post', bytes=len(body), records=len(chunk)):
+            async with session.post(url, data=body, headers=headers) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return self._handle_batch_result(result, chunk)
+                else:
+                    error_data = await response.json()
+                    raise Exception(f"API Error: {error_data.get('error', 'Unknown error')}")
+    
+    def _handle_batch_result(self, result: Dict[str, Any],
+                             chunk: BatchChunk) -> List[Optional[bool]]:
+        """Update delta session state from a batch response and return its acks"""
+        if self.delta is not None and result.get('error') == 'unknown_ref':
+            # Server lost the session; records are re-encoded in full next time
+            self.delta.reset()
+            return [None] * len(chunk)
+        
+        acks = self._parse_batch_result(result, len(chunk))
+        if self.delta is not None and any(acks):
+            self.delta.confirm(chunk.static)
+        return acks
+    
+    def _encode_body(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """Compress an encoded request body and build its headers"""
+        headers = {'Content-Type': self.codec.content_type}
+        body, encoding = self.compressor.compress(body)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        BYTES_SENT.inc(len(body))
+        return body, headers
+    
+    def _parse_batch_result(self, result: Dict[str, Any], count: int) -> List[Optional[bool]]:
+        """
+        Map a batch response to one acknowledgement per record
+        True is accepted, False rejected by the API, None not reported
+        """
+        per_record = result.get('results')
+        if per_record is None:
+            # Server acknowledged the request as a whole
+            return [result.get('status') == 'ok'] * count
+        
+        acks: List[Optional[bool]] = [None] * count
+        for position, entry in enumerate(per_record):
+            index = entry.get('index', position)
+            if 0 <= index < count:
+                acks[index] = entry.get('status') == 'ok'
+        return acks
     
     async def close(self):
         """Close the connection"""
         if self.session:
-            await self.session.close() 
\ No newline at end of file
+            await self.session.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        stats = dict(self._pool_stats)
+        requests = stats['connections_created'] + stats['connections_reused']
+        stats['reuse_ratio'] = stats['connections_reused'] / requests if requests else 0.0
+        return stats 
\ No newline at end of file
@@ -1,14 +1,46 @@
 import asyncio
-from typing import Dict, Any, List
+import logging
+import time
+from typing import Dict, Any, List, Optional
+from .alarm_engine import AlarmEngine
+from .metadata import MetadataProvider
+from .system_metrics import SystemMetricsSampler
 from ..hardware.sensors import SensorInterface
+from ..utils.metrics import REGISTRY
+from ..utils.tracing import span
+
+logger = logging.getLogger('lxpcloud_agent')
+
+SENSOR_READ_SECONDS = REGISTRY.histogram(
+    'lxp_sensor_read_seconds', "Sensor read latency", ('sensor',)
+)
+SENSOR_READ_ERRORS = REGISTRY.counter(
+    'lxp_sensor_read_errors_total', "Sensor reads that failed or timed out", ('sensor', 'reason')
+)
+COLLECT_CYCLE_SECONDS = REGISTRY.histogram(
+    'lxp_collect_cycle_seconds', "Duration of one collection cycle"
+)
 
 class DataCollector:
     """Collects data from various sensors"""
     
-    def __init__(self, sensor_config: Dict[str, Any]):
+    # Scheduler entry for system metrics and metadata
+    SYSTEM_ENTRY = '__system__'
+    
+    # Per-sensor default, overridable with 'stale_max_age'; the read
+    # timeout is the sensor's own (see SensorInterface.DEFAULT_TIMEOUT)
+    DEFAULT_STALE_MAX_AGE = 300.0
+    
+    def __init__(self, sensor_config: Dict[str, Any],
+                 metadata: Optional[MetadataProvider] = None,
+                 system_metrics: Optional[SystemMetricsSampler] = None):
         self.sensor_config = sensor_config
+        self.metadata = metadata or MetadataProvider()
+        self.system_metrics = system_metrics or SystemMetricsSampler()
         self.sensors = {}
+        self._last_readings = {}
         self._initialize_sensors()
+        self.alarm_engine = AlarmEngine(sensor_config)
     
     def _initialize_sensors(self):
         """Initialize sensors based on configuration"""
@@ -21,13 +53,38 @@ class DataCollector:
                 elif sensor_type == 'humidity':
                     from ..hardware.sensors import HumiditySensor
                     self.sensors[sensor_name] = HumiditySensor(config)
+                elif sensor_type == 'pressure':
+                    from ..hardware.sensors import PressureSensor
+                    self.sensors[sensor_name] = PressureSensor(config)
                 else:
                     # Generic sensor
                     self.sensors[sensor_name] = SensorInterface(config)
     
-    async def collect_all(self) -> Dict[str, Any]:
-        """Collect data from all sensors"""
+    def get_sample_periods(self, default_interval: float) -> Dict[str, float]:
+        """Sampling period per sensor; sensors may override the global interval"""
+        periods = {
+            sensor_name: float(self.sensor_config[sensor_name].get('interval', default_interval))
+            for sensor_name in self.sensors
+        }
+        periods[self.SYSTEM_ENTRY] = float(default_interval)
+        return periods
+    
+    async def collect_all(self, due: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Collect data from all sensors
+        If `due` is given only those sensors are read, and system metrics and
+        metadata are included only when SYSTEM_ENTRY is due
+        """
+        started = time.monotonic()
+        sensors = self.sensors
+        include_system = True
+        if due is not None:
+            sensors = {name: self.sensors[name] for name in due if name in self.sensors}
+            include_system = self.SYSTEM_ENTRY in due
+        
         data = {
+            # Sample time; records keep it however long they wait downstream
+            'timestamp': time.time(),
             'sensors': {},
             'metrics': {},
             'alarms': [],
@@ -36,108 +93,69 @@ class DataCollector:
             'network': {}
         }
         
-        # Collect sensor data
-        for sensor_name, sensor in self.sensors.items():
-            try:
-                sensor_data = await sensor.read()
+        with span('collect_all', sensors=len(sensors)):
+            # Read sensors concurrently and assemble results as they complete
+            reads = [self._read_sensor(name, sensor) for name, sensor in sensors.items()]
+            for completed in asyncio.as_completed(reads):
+                sensor_name, sensor_data = await completed
                 data['sensors'][sensor_name] = sensor_data
-            except Exception as e:
-                # Log error and continue with other sensors
-                print(f"Error reading sensor {sensor_name}: {e}")
-                data['sensors'][sensor_name] = {
-                    'value': 0,
-                    'unit': '',
-                    'accuracy': 0,
-                    'status': 'error'
-                }
-        
-        # Collect system metrics
-        data['metrics'] = await self._collect_system_metrics()
-        
-        # Collect alarms
-        data['alarms'] = await self._check_alarms(data['sensors'])
-        
-        # Collect metadata
-        data['location'] = await self._get_location()
-        data['environment'] = await self._get_environment()
-        data['network'] = await self._get_network_info()
+            
+            # Alarm transitions (raise/clear) for this sample
+            with span('alarms.evaluate'):
+                data['alarms'] = self.alarm_engine.evaluate(data['sensors'])
+            
+            if include_system:
+                with span('system'):
+                    # Latest snapshot from the background metrics sampler
+                    data['metrics'] = self.system_metrics.snapshot()
+                    
+                    # Cached metadata; slow probes refresh in the background
+                    data.update(self.metadata.get())
         
+        COLLECT_CYCLE_SECONDS.observe(time.monotonic() - started)
         return data
     
-    async def _collect_system_metrics(self) -> Dict[str, Any]:
-        """Collect system-level metrics"""
-        import psutil
+    async def _read_sensor(self, sensor_name: str, sensor: SensorInterface):
+        """Read one sensor with its own timeout, falling back to the last good value"""
+        # Same budget the sensor gives its driver calls, so a read that timed
+        # out here is not still holding the bus for the next one
+        timeout = sensor.timeout
         
-        return {
-            'cpu_usage': {
-                'value': psutil.cpu_percent(),
-                'unit': '%',
-                'status': 'normal'
-            },
-            'memory_usage': {
-                'value': psutil.virtual_memory().percent,
-                'unit': '%',
-                'status': 'normal'
-            },
-            'disk_usage': {
-                'value': psutil.disk_usage('/').percent,
-                'unit': '%',
-                'status': 'normal'
-            }
-        }
-    
-    async def _check_alarms(self, sensor_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Check for alarms based on sensor data"""
-        alarms = []
-        
-        for sensor_name, data in sensor_data.items():
-            if data.get('status') == 'critical':
-                alarms.append({
-                    'id': f"{sensor_name.upper()}_CRITICAL",
-                    'severity': 'critical',
-                    'message': f"{sensor_name} is in critical state",
-                    'timestamp': int(asyncio.get_event_loop().time())
-                })
-            elif data.get('status') == 'warning':
-                alarms.append({
-                    'id': f"{sensor_name.upper()}_WARNING",
-                    'severity': 'warning',
-                    'message': f"{sensor_name} is in warning state",
-                    'timestamp': int(asyncio.get_event_loop().time())
-                })
+        started = time.monotonic()
+        try:
+            with span('sensor.read', sensor=sensor_name):
+                sensor_data = await asyncio.wait_for(sensor.read(), timeout)
+            now = time.monotonic()
+            SENSOR_READ_SECONDS.observe(now - started, sensor=sensor_name)
+            self._last_readings[sensor_name] = (sensor_data, now)
+            return sensor_name, sensor_data
+        except (asyncio.TimeoutError, TimeoutError):
+            SENSOR_READ_ERRORS.inc(sensor=sensor_name, reason='timeout')
+            logger.warning(f"Timeout reading sensor {sensor_name} after {timeout}s")
+        except Exception as e:
+            # Log error and continue with other sensors
+            SENSOR_READ_ERRORS.inc(sensor=sensor_name, reason='error')
+            logger.error(f"Error reading sensor {sensor_name}: {e}")
         
-        return alarms
-    
-    async def _get_location(self) -> Dict[str, Any]:
-        """Get device location information"""
-        # This would typically get GPS coordinates or configured location
-        return {
-            'latitude': 41.0082,  # Default to Istanbul
-            'longitude': 28.9784,
-            'altitude': 100
-        }
+        return sensor_name, self._fallback_reading(sensor_name)
     
-    async def _get_environment(self) -> Dict[str, Any]:
-        """Get environmental information"""
-        return {
-            'ambient_temperature': 22.0,
-            'ambient_humidity': 45.0
-        }
-    
-    async def _get_network_info(self) -> Dict[str, Any]:
-        """Get network information"""
-        import socket
+    def _fallback_reading(self, sensor_name: str) -> Dict[str, Any]:
+        """Last good reading marked as stale, or an error reading if it is too old"""
+        max_age = self.sensor_config[sensor_name].get('stale_max_age', self.DEFAULT_STALE_MAX_AGE)
+        last = self._last_readings.get(sensor_name)
         
-        try:
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
-        except:
-            hostname = "unknown"
-            ip_address = "0.0.0.0"
+        if last is not None:
+            sensor_data, read_at = last
+            age = time.monotonic() - read_at
+            if age <= max_age:
+                stale_data = dict(sensor_data)
+                stale_data['status'] = 'stale'
+                stale_data['age'] = round(age, 3)
+                return stale_data
         
         return {
-            'hostname': hostname,
-            'ip_address': ip_address,
-            'connection_type': 'ethernet',  # or wifi
-            'signal_strength': -45  # for wifi
-        } 
\ No newline at end of file
+            'value': 0,
+            'unit': '',
+            'accuracy': 0,
+            'status': 'error'
+        }
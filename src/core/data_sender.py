@@ -1,60 +1,217 @@
 import asyncio
-from typing import Dict, Any
-from .connection import LXPConnection
+import logging
+import time
+from typing import Dict, Any, List, Callable, Awaitable, Optional, Tuple
+from .connection import LXPConnection, BatchChunk
+from .retry_policy import RetryPolicy, RetryBudget, CircuitBreaker
+from ..utils.metrics import REGISTRY
+from ..utils.tracing import span
+
+logger = logging.getLogger('lxpcloud_agent')
+
+UPLOAD_SECONDS = REGISTRY.histogram(
+    'lxp_upload_request_seconds', "Latency of API requests", ('lane', 'outcome')
+)
+UPLOAD_RETRIES = REGISTRY.counter(
+    'lxp_upload_retries_total', "API requests retried after a failure", ('lane',)
+)
+UPLOAD_GIVE_UPS = REGISTRY.counter(
+    'lxp_upload_give_ups_total', "API requests abandoned without success", ('lane', 'reason')
+)
 
 class DataSender:
     """Handles data transmission to LXPCloud API"""
     
-    def __init__(self, connection: LXPConnection):
+    def __init__(self, connection: LXPConnection, retry_config: Optional[Dict[str, Any]] = None,
+                 lane: str = 'upload'):
         self.connection = connection
+        # Metrics label separating e.g. routine uploads from the alarm lane
+        self.lane = lane
+        retry_config = retry_config or {}
+        
+        # The only retry loop on the upload path; LXPConnection makes single attempts
+        self.retry_policy = RetryPolicy(retry_config)
+        self.retry_budget = RetryBudget(retry_config)
+        self.circuit_breaker = CircuitBreaker(retry_config)
         self.retry_count = 0
-        self.max_retries = 3
+        self.max_retries = self.retry_policy.max_attempts
+        self._probing = False
+        
+        self.max_in_flight = max(1, connection.max_in_flight)
+        # Called with (rtt_seconds, success) after every request attempt
+        self.on_request_complete: Optional[Callable[[float, bool], None]] = None
     
-    async def send_data(self, data: Dict[str, Any]) -> bool:
+    async def send_data(self, data: Dict[str, Any], sequence: Optional[int] = None) -> bool:
         """Send data to LXPCloud API with retry logic"""
-        for attempt in range(self.max_retries):
+        return bool(await self._send_record(data, sequence))
+    
+    async def _send_record(self, data: Dict[str, Any],
+                           sequence: Optional[int] = None) -> Optional[bool]:
+        """Send one record; None if the request did not get through"""
+        with span('send_data', lane=self.lane):
+            return await self._call_with_retry(
+                lambda: self.connection.send_data(data, sequence)
+            )
+    
+    async def _call_with_retry(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run one API request under the shared retry policy
+        Transport and HTTP errors are retried with jittered backoff while the
+        retry budget lasts; returns None if the request did not get through
+        """
+        for attempt in range(self.retry_policy.max_attempts):
+            if not await self._circuit_allows():
+                UPLOAD_GIVE_UPS.inc(lane=self.lane, reason='circuit_open')
+                return None
+            if attempt == 0:
+                self.retry_budget.record_request()
+            
+            started = time.monotonic()
             try:
-                success = await self.connection.send_data(data)
-                if success:
-                    self.retry_count = 0  # Reset retry count on success
-                    return True
-                else:
-                    raise Exception("API returned failure status")
-                    
+                with span('request', lane=self.lane, attempt=attempt + 1):
+                    result = await call()
+                self._observe(started, True)
+                self.circuit_breaker.record_success()
+                self.retry_count = 0
+                return result
+                
             except Exception as e:
+                self._observe(started, False)
+                self.circuit_breaker.record_failure()
                 self.retry_count += 1
-                if attempt == self.max_retries - 1:
-                    # Last attempt failed
-                    print(f"Failed to send data after {self.max_retries} attempts: {e}")
-                    return False
-                else:
-                    # Wait before retry with exponential backoff
-                    wait_time = 2 ** attempt
-                    print(f"Attempt {attempt + 1} failed, retrying in {wait_time} seconds...")
+                
+                if attempt == self.retry_policy.max_attempts - 1:
+                    UPLOAD_GIVE_UPS.inc(lane=self.lane, reason='attempts')
+                    logger.error(f"Request failed after {attempt + 1} attempts: {e}")
+                    return None
+                if not self.retry_budget.try_acquire():
+                    UPLOAD_GIVE_UPS.inc(lane=self.lane, reason='retry_budget')
+                    logger.error(f"Request failed, retry budget exhausted: {e}")
+                    return None
+                UPLOAD_RETRIES.inc(lane=self.lane)
+                
+                wait_time = self.retry_policy.delay(attempt)
+                logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time:.1f} seconds...")
+                with span('retry.backoff', lane=self.lane, attempt=attempt + 1):
                     await asyncio.sleep(wait_time)
         
-        return False
+        return None
+    
+    async def _circuit_allows(self) -> bool:
+        """Check the circuit breaker, probing the endpoint when it is half-open"""
+        state = self.circuit_breaker.state
+        if state == CircuitBreaker.CLOSED:
+            return True
+        if state == CircuitBreaker.OPEN or self._probing:
+            return False
+        
+        # Half-open: a single probe decides whether uploads resume
+        self._probing = True
+        try:
+            healthy = await self.connection.test_connection()
+        except Exception:
+            healthy = False
+        finally:
+            self._probing = False
+        
+        if healthy:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+        return healthy
     
-    async def send_batch(self, data_batch: list) -> Dict[str, int]:
-        """Send a batch of data records"""
+    async def send_batch(self, data_batch: list,
+                         sequences: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Send a batch of data records
+        `sequences` are durable per-record numbers (buffer row ids) that a
+        record keeps across resends and restarts, letting the API restore
+        per-device order. Requests are pipelined up to max_in_flight. 'results' holds one entry
+        per record: True if accepted, False if the API rejected it, None if
+        it was not delivered. 'failed' counts both of the latter
+        """
         results = {
             'successful': 0,
             'failed': 0,
-            'total': len(data_batch)
+            'rejected': 0,
+            'total': len(data_batch),
+            'results': []
         }
         
-        for data in data_batch:
-            success = await self.send_data(data)
-            if success:
-                results['successful'] += 1
+        with span('send_batch', lane=self.lane, records=len(data_batch)):
+            if self.connection.batch_mode:
+                chunks = self.connection.split_batch(data_batch, sequences)
+                sizes = [len(chunk) for chunk in chunks]
+                chunk_acks = await self._send_pipelined(chunks, self._send_chunk, sizes)
             else:
-                results['failed'] += 1
+                units = list(zip(data_batch, sequences or [None] * len(data_batch)))
+                chunk_acks = await self._send_pipelined(
+                    units, self._send_single, [1] * len(data_batch)
+                )
         
+        acks = [ack for chunk in chunk_acks for ack in chunk]
+        results['results'] = acks
+        results['successful'] = sum(1 for ack in acks if ack)
+        results['rejected'] = sum(1 for ack in acks if ack is False)
+        results['failed'] = len(acks) - results['successful']
         return results
     
+    async def _send_pipelined(self, units: list,
+                              send: Callable[[Any], Awaitable[List[Optional[bool]]]],
+                              sizes: List[int]) -> List[List[Optional[bool]]]:
+        """
+        Send units concurrently with at most max_in_flight outstanding requests
+        Units are launched in order; after a unit fails to get through no new
+        units are started and the rest are reported as not delivered. Records
+        the API answered, even with a rejection, do not stop the pipeline
+        """
+        acks: List[List[Optional[bool]]] = [[None] * size for size in sizes]
+        window = asyncio.Semaphore(self.max_in_flight)
+        failed = asyncio.Event()
+        
+        async def run(index: int, unit: Any):
+            try:
+                acks[index] = await send(unit)
+                if any(ack is None for ack in acks[index]):
+                    failed.set()
+            finally:
+                window.release()
+        
+        tasks = []
+        for index, unit in enumerate(units):
+            await window.acquire()
+            if failed.is_set():
+                window.release()
+                break
+            tasks.append(asyncio.create_task(run(index, unit)))
+        
+        await asyncio.gather(*tasks)
+        return acks
+    
+    async def _send_single(self,
+                           unit: Tuple[Dict[str, Any], Optional[int]]) -> List[Optional[bool]]:
+        data, sequence = unit
+        return [await self._send_record(data, sequence)]
+    
+    async def _send_chunk(self, chunk: BatchChunk) -> List[Optional[bool]]:
+        """Send one batch request with retry logic"""
+        acks = await self._call_with_retry(lambda: self.connection.send_batch(chunk))
+        return acks if acks is not None else [None] * len(chunk)
+    
+    def _observe(self, started: float, success: bool):
+        rtt = time.monotonic() - started
+        UPLOAD_SECONDS.observe(rtt, lane=self.lane, outcome='ok' if success else 'error')
+        if self.on_request_complete is not None:
+            self.on_request_complete(rtt, success)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get transmission statistics"""
         return {
             'retry_count': self.retry_count,
-            'max_retries': self.max_retries
+            'max_retries': self.max_retries,
+            'max_in_flight': self.max_in_flight,
+            'retry_budget': self.retry_budget.tokens,
+            'retry_budget_exhausted': self.retry_budget.exhausted,
+            'circuit_state': self.circuit_breaker.state,
+            'circuit_opened': self.circuit_breaker.opened
         } 
\ No newline at end of file
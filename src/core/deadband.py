@@ -0,0 +1,97 @@
+import time
+from typing import Dict, Any, Optional
+
+class DeadbandFilter:
+    """
+    Report-by-exception filtering of sensor and metric readings
+    A reading is forwarded only when its value moves beyond the absolute or
+    percentage band around the last forwarded value, its status changes,
+    or max_silence seconds have passed since the last forwarded reading.
+    Readings without a band configured are always forwarded
+    """
+
+    def __init__(self, sensor_config: Dict[str, Any],
+                 metrics_band: Optional[Dict[str, Any]] = None):
+        self._bands = {
+            f"sensors.{name}": config['deadband']
+            for name, config in sensor_config.items()
+            if config.get('deadband')
+        }
+        self._metrics_band = metrics_band or None
+
+        # Last forwarded (value, status, monotonic time) per reading
+        self._last_sent: Dict[str, tuple] = {}
+        self.forwarded: Dict[str, int] = {}
+        self.suppressed: Dict[str, int] = {}
+
+    def filter(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Drop readings inside their deadband
+        Returns None when no sensor, metric or alarm is left to send
+        """
+        now = time.monotonic()
+        filtered = dict(raw_data)
+
+        for group in ('sensors', 'metrics'):
+            readings = {}
+            for name, reading in raw_data.get(group, {}).items():
+                key = f"{group}.{name}"
+                band = self._bands.get(key)
+                if band is None and group == 'metrics':
+                    band = self._metrics_band
+
+                if band is None or self._should_forward(key, band, reading, now):
+                    readings[name] = reading
+                    self.forwarded[key] = self.forwarded.get(key, 0) + 1
+                else:
+                    self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            filtered[group] = readings
+
+        if not (filtered['sensors'] or filtered['metrics'] or filtered.get('alarms')):
+            return None
+        return filtered
+
+    def _should_forward(self, key: str, band: Dict[str, Any],
+                        reading: Dict[str, Any], now: float) -> bool:
+        value = reading.get('value')
+        status = reading.get('status', 'normal')
+        last = self._last_sent.get(key)
+
+        forward = (
+            last is None or
+            status != last[1] or
+            now - last[2] >= band.get('max_silence', 300) or
+            not isinstance(value, (int, float)) or
+            not isinstance(last[0], (int, float)) or
+            self._outside_band(value, last[0], band)
+        )
+        if forward:
+            self._last_sent[key] = (value, status, now)
+        return forward
+
+    @staticmethod
+    def _outside_band(value: float, reference: float, band: Dict[str, Any]) -> bool:
+        change = abs(value - reference)
+        if 'absolute' in band and change > band['absolute']:
+            return True
+        if 'percent' in band and change > abs(reference) * band['percent'] / 100.0:
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Forwarded and suppressed reading counts"""
+        forwarded = sum(self.forwarded.values())
+        suppressed = sum(self.suppressed.values())
+        total = forwarded + suppressed
+        return {
+            'forwarded': forwarded,
+            'suppressed': suppressed,
+            'suppression_ratio': suppressed / total if total else 0.0,
+            'per_reading': {
+                key: {
+                    'forwarded': self.forwarded.get(key, 0),
+                    'suppressed': self.suppressed.get(key, 0)
+                }
+                for key in set(self.forwarded) | set(self.suppressed)
+            }
+        }
@@ -0,0 +1,81 @@
+from typing import Dict, Any, Optional
+
+class FlushPolicy:
+    """
+    Decides when buffered records are uploaded
+    A flush is due when the record count, serialized bytes or the age of
+    the oldest record reaches its limit, whichever comes first. With
+    adaptive batching the record limit grows while uploads are slow or
+    failing, and shrinks back once the link recovers. The per-request
+    record cap scales by the same factor, so slow links get fewer, larger
+    requests rather than just later flushes
+    """
+
+    def __init__(self, batch_size: int, config: Dict[str, Any],
+                 request_size: Optional[int] = None):
+        self.base_batch_size = batch_size
+        self.batch_size = batch_size
+        self.base_request_size = request_size or batch_size
+        self.max_bytes = config.get('max_bytes', 64 * 1024)
+        self.max_age = config.get('max_age', 60.0)
+        self.adaptive = config.get('adaptive', True)
+        self.max_batch_size = config.get('max_batch_size', batch_size * 8)
+        self.rtt_threshold = config.get('rtt_threshold', 2.0)
+        self.error_threshold = config.get('error_threshold', 0.2)
+
+        # Exponentially weighted moving averages of request RTT and failures
+        self._alpha = 0.2
+        self.rtt_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+
+    def should_flush(self, count: int, size_bytes: int,
+                     oldest_age: Optional[float]) -> Optional[str]:
+        """Return the trigger that makes a flush due, or None"""
+        if count == 0:
+            return None
+        if count >= self.batch_size:
+            return 'count'
+        if size_bytes >= self.max_bytes:
+            return 'bytes'
+        if oldest_age is not None and oldest_age >= self.max_age:
+            return 'age'
+        return None
+
+    @property
+    def request_size(self) -> int:
+        """Records per upload request, scaled with the adaptive batch size"""
+        return self.base_request_size * self.batch_size // self.base_batch_size
+
+    def time_until_due(self, oldest_age: Optional[float]) -> Optional[float]:
+        """Seconds until the age trigger fires, or None while the buffer is empty"""
+        if oldest_age is None:
+            return None
+        return max(0.0, self.max_age - oldest_age)
+
+    def record_result(self, rtt: float, success: bool):
+        """Feed one request outcome into the adaptive batch size"""
+        if self.rtt_ewma is None:
+            self.rtt_ewma = rtt
+        else:
+            self.rtt_ewma += self._alpha * (rtt - self.rtt_ewma)
+        self.error_ewma += self._alpha * ((0.0 if success else 1.0) - self.error_ewma)
+
+        if not self.adaptive:
+            return
+
+        if self.rtt_ewma > self.rtt_threshold or self.error_ewma > self.error_threshold:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+        elif (self.rtt_ewma < self.rtt_threshold / 2 and
+              self.error_ewma < self.error_threshold / 4):
+            self.batch_size = max(self.base_batch_size, self.batch_size // 2)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get flush policy state"""
+        return {
+            'batch_size': self.batch_size,
+            'request_size': self.request_size,
+            'max_bytes': self.max_bytes,
+            'max_age': self.max_age,
+            'rtt_ewma': self.rtt_ewma,
+            'error_ewma': self.error_ewma
+        }
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import socket
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger('lxpcloud_agent')
+
+# Seconds each metadata field stays fresh, overridable with metadata.ttl
+DEFAULT_TTLS = {
+    'location': 3600.0,
+    'environment': 60.0,
+    'network': 300.0
+}
+
+DEFAULT_LOCATION = {
+    'latitude': 41.0082,  # Default to Istanbul
+    'longitude': 28.9784,
+    'altitude': 100
+}
+
+class MetadataProvider:
+    """
+    Cached metadata for LXP documents (location, environment, network)
+    get() never waits on a probe: it returns the cached values and starts a
+    background refresh for fields whose TTL expired. Host name resolution
+    runs off the event loop with a timeout, and a change in the network
+    interfaces (link up/down, address change) invalidates the network field
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(config.get('ttl', {}))
+        self.resolve_timeout = config.get('resolve_timeout', 2.0)
+        self.fingerprint_interval = config.get('fingerprint_interval', 5.0)
+        self.location = config.get('location') or DEFAULT_LOCATION
+
+        self._probes: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            'location': self._probe_location,
+            'environment': self._probe_environment,
+            'network': self._probe_network
+        }
+        self._values: Dict[str, Dict[str, Any]] = {
+            'location': dict(self.location),
+            'environment': {},
+            'network': {
+                'hostname': socket.gethostname(),
+                'ip_address': '0.0.0.0',
+                'connection_type': 'unknown'
+            }
+        }
+        self._expires: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+        self._fingerprint = None
+        self._fingerprint_checked = 0.0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    def get(self) -> Dict[str, Dict[str, Any]]:
+        """Current metadata per field; expired fields refresh in the background"""
+        now = time.monotonic()
+        if now - self._fingerprint_checked >= self.fingerprint_interval:
+            self._fingerprint_checked = now
+            self._check_network_change()
+
+        for field in self._probes:
+            if now >= self._expires.get(field, 0.0):
+                self._schedule_refresh(field)
+
+        return dict(self._values)
+
+    def invalidate(self, field: str):
+        """Force a field to be refreshed on the next get()"""
+        self._expires.pop(field, None)
+        self.invalidations += 1
+
+    def _schedule_refresh(self, field: str):
+        task = self._refreshing.get(field)
+        if task is not None and not task.done():
+            return
+        self._refreshing[field] = asyncio.ensure_future(self._refresh(field))
+
+    async def _refresh(self, field: str):
+        try:
+            self._values[field] = await self._probes[field]()
+            self.refreshes += 1
+        except Exception as e:
+            # Keep serving the last known value
+            logger.warning(f"Metadata probe '{field}' failed: {e}")
+        # Failed probes are retried after the TTL like successful ones
+        self._expires[field] = time.monotonic() + self.ttls.get(field, 60.0)
+
+    def _check_network_change(self):
+        fingerprint = self._network_fingerprint()
+        if fingerprint is None:
+            return
+        if self._fingerprint is not None and fingerprint != self._fingerprint:
+            self.invalidate('network')
+        self._fingerprint = fingerprint
+
+    @staticmethod
+    def _network_fingerprint() -> Optional[tuple]:
+        """Interface link states and addresses, or None without psutil"""
+        try:
+            import psutil
+        except ImportError:
+            return None
+
+        stats = psutil.net_if_stats()
+        return tuple(sorted(
+            (name, stats[name].isup if name in stats else False,
+             tuple(sorted(address.address for address in addresses)))
+            for name, addresses in psutil.net_if_addrs().items()
+        ))
+
+    async def _probe_location(self) -> Dict[str, Any]:
+        """Configured location; a GPS receiver would be read here"""
+        return dict(self.location)
+
+    async def _probe_environment(self) -> Dict[str, Any]:
+        """Get environmental information"""
+        return {
+            'ambient_temperature': 22.0,
+            'ambient_humidity': 45.0
+        }
+
+    async def _probe_network(self) -> Dict[str, Any]:
+        """Host name, primary IPv4 address and link type"""
+        hostname = socket.gethostname()
+        interface, ip_address = self._primary_interface()
+
+        if ip_address is None:
+            # No interface table: resolve the host name without blocking the loop
+            loop = asyncio.get_event_loop()
+            try:
+                infos = await asyncio.wait_for(
+                    loop.getaddrinfo(hostname, None, family=socket.AF_INET),
+                    self.resolve_timeout
+                )
+                ip_address = infos[0][4][0]
+            except (asyncio.TimeoutError, OSError, IndexError):
+                ip_address = '0.0.0.0'
+
+        connection_type = 'unknown'
+        if interface is not None:
+            connection_type = 'wifi' if interface.startswith('wl') else 'ethernet'
+
+        return {
+            'hostname': hostname,
+            'ip_address': ip_address,
+            'interface': interface,
+            'connection_type': connection_type,
+            'signal_strength': -45  # for wifi
+        }
+
+    @staticmethod
+    def _primary_interface() -> tuple:
+        """(interface, IPv4 address) of the first non-loopback interface that is up"""
+        try:
+            import psutil
+        except ImportError:
+            return None, None
+
+        stats = psutil.net_if_stats()
+        for name, addresses in sorted(psutil.net_if_addrs().items()):
+            if name == 'lo' or name not in stats or not stats[name].isup:
+                continue
+            for address in addresses:
+                if address.family == socket.AF_INET and not address.address.startswith('127.'):
+                    return name, address.address
+        return None, None
+
+    async def close(self):
+        """Cancel refreshes still in flight"""
+        for task in self._refreshing.values():
+            task.cancel()
+        for task in self._refreshing.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._refreshing.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get metadata cache statistics"""
+        now = time.monotonic()
+        return {
+            'refreshes': self.refreshes,
+            'invalidations': self.invalidations,
+            'expires_in': {
+                field: max(0.0, expires - now) for field, expires in self._expires.items()
+            }
+        }
@@ -0,0 +1,95 @@
+import asyncio
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .storage import PersistentQueue
+
+class BoundedQueue:
+    """
+    Bounded asyncio queue joining two pipeline stages
+    The backpressure policy decides what a full queue does with a new item:
+    'block' waits for room, 'drop_oldest' discards the oldest item and
+    'spill' overflows to an on-disk PersistentQueue
+    """
+
+    POLICIES = ('block', 'drop_oldest', 'spill')
+
+    def __init__(self, maxsize: int, policy: str = 'block',
+                 spill: Optional[PersistentQueue] = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        if policy == 'spill' and spill is None:
+            raise ValueError("Spill policy requires a spill queue")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.spill = spill
+
+        self._items = deque()
+        self._changed = asyncio.Condition()
+        self._stats = {
+            'put': 0,
+            'dropped': 0,
+            'spilled': 0
+        }
+
+    async def put(self, item: Any):
+        """Add an item, applying the backpressure policy if the queue is full"""
+        async with self._changed:
+            self._stats['put'] += 1
+
+            if self.policy == 'spill' and (len(self.spill) or self._full()):
+                # Once anything is spilled, newer items follow it to disk
+                # so that items still come out in FIFO order
+                self.spill.put(item)
+                self._stats['spilled'] += 1
+            else:
+                if self._full():
+                    if self.policy == 'drop_oldest':
+                        self._items.popleft()
+                        self._stats['dropped'] += 1
+                    else:
+                        await self._changed.wait_for(lambda: not self._full())
+                self._items.append(item)
+
+            self._changed.notify_all()
+
+    async def get(self) -> Any:
+        """Remove and return the oldest item, waiting until one is available"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.qsize() > 0)
+
+            if self._items:
+                item = self._items.popleft()
+            else:
+                record_id, item = self.spill.peek(1)[0]
+                self.spill.ack([record_id])
+
+            self._changed.notify_all()
+            return item
+
+    def get_nowait(self) -> Any:
+        """Remove and return the oldest item without waiting"""
+        if self._items:
+            return self._items.popleft()
+        if self.spill is not None and len(self.spill):
+            record_id, item = self.spill.peek(1)[0]
+            self.spill.ack([record_id])
+            return item
+        raise asyncio.QueueEmpty()
+
+    def _full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    def qsize(self) -> int:
+        spilled = len(self.spill) if self.spill is not None else 0
+        return len(self._items) + spilled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics"""
+        return {
+            'depth': self.qsize(),
+            'maxsize': self.maxsize,
+            'policy': self.policy,
+            **self._stats
+        }
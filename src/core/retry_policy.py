@@ -0,0 +1,94 @@
+import random
+import time
+from typing import Dict, Any
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.max_attempts = max(1, config.get('max_attempts', 3))
+        self.base_delay = config.get('base_delay', 1.0)
+        self.max_delay = config.get('max_delay', 30.0)
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (0 = first retry)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of recent requests
+    Every first attempt deposits `ratio` tokens and every retry spends one,
+    so retries cannot multiply the load on an endpoint that is struggling
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.ratio = config.get('budget_ratio', 0.2)
+        self.capacity = config.get('budget_capacity', 10.0)
+        self.tokens = self.capacity
+        self.exhausted = 0
+
+    def record_request(self):
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
+
+class CircuitBreaker:
+    """
+    Circuit breaker for the LXPCloud endpoint
+    Opens after consecutive failures; once the reset timeout expires it is
+    half-open and the caller should probe before sending again. Every
+    failed probe doubles the timeout up to max_reset_timeout
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, config: Dict[str, Any]):
+        self.failure_threshold = config.get('failure_threshold', 5)
+        self.base_reset_timeout = config.get('reset_timeout', 30.0)
+        self.max_reset_timeout = config.get('max_reset_timeout', 600.0)
+
+        self.reset_timeout = self.base_reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self._open_until = None
+
+    @property
+    def state(self) -> str:
+        if self._open_until is None:
+            return self.CLOSED
+        if time.monotonic() < self._open_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker allows a probe (0 if not open)"""
+        if self._open_until is None:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self):
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._open_until = None
+
+    def record_failure(self):
+        self.failures += 1
+        state = self.state
+        if state == self.HALF_OPEN:
+            # Failed probe: back off further before the next one
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            self._trip()
+        elif state == self.CLOSED and self.failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self):
+        self.opened += 1
+        self._open_until = time.monotonic() + self.reset_timeout
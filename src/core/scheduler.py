@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Callable, Awaitable, Optional, Tuple
+
+logger = logging.getLogger('lxpcloud_agent')
+
+class SamplingScheduler:
+    """
+    Drift-free sampling scheduler
+    Each entry runs on its own period with deadlines on the monotonic clock,
+    so the time spent collecting never accumulates into the schedule. Due
+    entries are dispatched as one task per period, so a slow entry only
+    delays entries sharing its period; while a previous run is still going
+    the entry's ticks are skipped
+    """
+
+    def __init__(self, periods: Dict[str, float],
+                 on_overrun: Optional[Callable[[str, float, int], None]] = None):
+        for name, period in periods.items():
+            if period <= 0:
+                raise ValueError(f"Sampling period for {name} must be positive")
+
+        self.periods = dict(periods)
+        self.on_overrun = on_overrun
+        self.running = False
+        self._stats = {
+            name: {'runs': 0, 'overruns': 0, 'skipped': 0, 'max_lateness': 0.0}
+            for name in self.periods
+        }
+
+    async def run(self, on_due: Callable[[List[str]], Awaitable[None]]):
+        """Call on_due with the names of all entries whose deadline has passed"""
+        self.running = True
+        start = time.monotonic()
+        deadlines = {name: start for name in self.periods}
+        # Entry name -> (task running it, start time)
+        busy: Dict[str, Tuple[asyncio.Task, float]] = {}
+
+        try:
+            while self.running and deadlines:
+                now = time.monotonic()
+                next_deadline = min(deadlines.values())
+                if next_deadline > now:
+                    await asyncio.sleep(next_deadline - now)
+                    continue
+
+                due = []
+                for name, deadline in deadlines.items():
+                    if deadline > now:
+                        continue
+                    if name in busy:
+                        deadlines[name] = self._skip_busy(name, deadline, now - busy[name][1])
+                    else:
+                        due.append(name)
+                        deadlines[name] = self._advance(name, deadline, now)
+
+                # Entries sharing a period always fall due together and keep
+                # producing one combined sample; other periods run separately
+                groups: Dict[float, List[str]] = {}
+                for name in due:
+                    groups.setdefault(self.periods[name], []).append(name)
+                for names in groups.values():
+                    task = asyncio.ensure_future(on_due(names))
+                    for name in names:
+                        busy[name] = (task, now)
+                    task.add_done_callback(
+                        lambda done, names=names: self._finish(done, names, busy)
+                    )
+        finally:
+            for task in {task for task, _ in busy.values()}:
+                task.cancel()
+
+    def _finish(self, task: asyncio.Task, names: List[str],
+                busy: Dict[str, Tuple[asyncio.Task, float]]):
+        """Free the entries of a completed run"""
+        for name in names:
+            busy.pop(name, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Sampling run for {', '.join(names)} failed: {task.exception()}")
+
+    def _skip_busy(self, name: str, deadline: float, running_for: float) -> float:
+        """Skip a tick whose entry is still busy with its previous run"""
+        stats = self._stats[name]
+        stats['overruns'] += 1
+        stats['skipped'] += 1
+        logger.warning(
+            f"Sampling overrun on {name}: previous run busy for {running_for:.3f}s, skipped 1 tick"
+        )
+        if self.on_overrun:
+            self.on_overrun(name, running_for, 1)
+        return deadline + self.periods[name]
+
+    def _advance(self, name: str, deadline: float, now: float) -> float:
+        """Compute the next deadline, skipping ticks that were missed entirely"""
+        period = self.periods[name]
+        lateness = now - deadline
+        stats = self._stats[name]
+        stats['runs'] += 1
+        stats['max_lateness'] = max(stats['max_lateness'], lateness)
+
+        if lateness < period:
+            return deadline + period
+
+        # Overrun: stay on the original grid instead of bursting to catch up
+        skipped = int(lateness // period)
+        stats['overruns'] += 1
+        stats['skipped'] += skipped
+        logger.warning(
+            f"Sampling overrun on {name}: {lateness:.3f}s late, skipped {skipped} ticks"
+        )
+        if self.on_overrun:
+            self.on_overrun(name, lateness, skipped)
+        return deadline + (skipped + 1) * period
+
+    def stop(self):
+        """Stop the scheduler after the current tick"""
+        self.running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-entry scheduling statistics"""
+        return {
+            name: {'period': self.periods[name], **stats}
+            for name, stats in self._stats.items()
+        }
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..utils.logger import _parse_size_string
+
+logger = logging.getLogger('lxpcloud_agent')
+
+class PersistentQueue:
+    """
+    Durable store-and-forward queue backed by SQLite in WAL mode
+    Records survive restarts and are only removed once acknowledged.
+    Records the API rejects outright are retried up to `max_rejections`
+    times and then moved to a capped dead-letter table
+    """
+
+    EVICTION_POLICIES = ('drop_oldest', 'drop_newest')
+
+    def __init__(self, config: Dict[str, Any]):
+        self.path = config.get('path', '/var/lib/lxpcloud-agent/buffer.db')
+        self.max_bytes = _parse_size_string(str(config.get('max_size', '100MB')))
+        self.max_records = config.get('max_records')
+        self.eviction = config.get('eviction', 'drop_oldest')
+        self.sync_batch = config.get('sync_batch', 50)
+        self.sync_interval = config.get('sync_interval', 1.0)
+        self.max_rejections = config.get('max_rejections', 3)
+        self.dead_letter_max_records = config.get('dead_letter_max_records', 1000)
+
+        if self.eviction not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {self.eviction}")
+
+        self._pending_writes = 0
+        self._last_sync = time.monotonic()
+        self._stats = {
+            'enqueued': 0,
+            'acknowledged': 0,
+            'evicted': 0,
+            'rejected': 0,
+            'dead_lettered': 0,
+            'syncs': 0
+        }
+
+        self._conn = self._open()
+        self._count, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records"
+        ).fetchone()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the queue database, creating it if needed"""
+        db_dir = os.path.dirname(self.path)
+        if db_dir and not os.path.exists(db_dir):
+            try:
+                os.makedirs(db_dir, exist_ok=True)
+            except PermissionError:
+                # Fallback to current directory if no permission
+                self.path = 'lxpcloud-agent-buffer.db'
+
+        # Autocommit mode; write transactions are opened and committed
+        # explicitly so several records share one fsync
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "created REAL NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "body TEXT NOT NULL)"
+        )
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(records)")]
+        if 'rejections' not in columns:
+            conn.execute("ALTER TABLE records ADD COLUMN rejections INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "created REAL NOT NULL, "
+            "failed_at REAL NOT NULL, "
+            "rejections INTEGER NOT NULL, "
+            "body TEXT NOT NULL)"
+        )
+        return conn
+
+    def put(self, record: Dict[str, Any]) -> bool:
+        """Append a record; returns False if it was rejected by the eviction policy"""
+        body = json.dumps(record, separators=(',', ':'))
+        size = len(body)
+
+        if not self._make_room(size):
+            self._stats['rejected'] += 1
+            return False
+
+        self._begin()
+        self._conn.execute(
+            "INSERT INTO records (created, size, body) VALUES (?, ?, ?)",
+            (time.time(), size, body)
+        )
+        self._count += 1
+        self._bytes += size
+        self._stats['enqueued'] += 1
+        self._pending_writes += 1
+        self._maybe_sync()
+        return True
+
+    def peek(self, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return up to `limit` of the oldest unacknowledged records as (id, record)"""
+        rows = self._conn.execute(
+            "SELECT id, body FROM records ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        return [(record_id, json.loads(body)) for record_id, body in rows]
+
+    def ack(self, record_ids: List[int]):
+        """Remove acknowledged records from the queue"""
+        if not record_ids:
+            return
+
+        self._begin()
+        placeholders = ','.join('?' * len(record_ids))
+        count, size = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records WHERE id IN ({placeholders})",
+            record_ids
+        ).fetchone()
+        self._conn.execute(f"DELETE FROM records WHERE id IN ({placeholders})", record_ids)
+        self._count -= count
+        self._bytes -= size
+        self._stats['acknowledged'] += count
+        self._pending_writes += count
+        self._maybe_sync()
+
+    def reject(self, record_ids: List[int]) -> int:
+        """
+        Count an API rejection against records
+        Records reaching max_rejections move to the dead-letter table;
+        returns how many were moved
+        """
+        if not record_ids:
+            return 0
+
+        self._begin()
+        placeholders = ','.join('?' * len(record_ids))
+        self._conn.execute(
+            f"UPDATE records SET rejections = rejections + 1 WHERE id IN ({placeholders})",
+            record_ids
+        )
+        rows = self._conn.execute(
+            f"SELECT id, created, size, rejections, body FROM records "
+            f"WHERE id IN ({placeholders}) AND rejections >= ?",
+            list(record_ids) + [self.max_rejections]
+        ).fetchall()
+
+        if rows:
+            now = time.time()
+            self._conn.executemany(
+                "INSERT INTO dead_letters (created, failed_at, rejections, body) VALUES (?, ?, ?, ?)",
+                [(created, now, rejections, body) for _, created, _, rejections, body in rows]
+            )
+            self._conn.executemany("DELETE FROM records WHERE id = ?", [(row[0],) for row in rows])
+            self._conn.execute(
+                "DELETE FROM dead_letters WHERE id NOT IN "
+                "(SELECT id FROM dead_letters ORDER BY id DESC LIMIT ?)",
+                (self.dead_letter_max_records,)
+            )
+            self._count -= len(rows)
+            self._bytes -= sum(row[2] for row in rows)
+            self._stats['dead_lettered'] += len(rows)
+            logger.warning(f"Moved {len(rows)} records rejected by the API to the dead-letter table")
+
+        self._pending_writes += len(record_ids)
+        self._maybe_sync()
+        return len(rows)
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead-lettered records, newest first"""
+        rows = self._conn.execute(
+            "SELECT created, failed_at, rejections, body FROM dead_letters ORDER BY id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [
+            {'created': created, 'failed_at': failed_at, 'rejections': rejections,
+             'record': json.loads(body)}
+            for created, failed_at, rejections, body in rows
+        ]
+
+    def _make_room(self, size: int) -> bool:
+        """Apply the eviction policy so a record of `size` bytes fits"""
+        if size > self.max_bytes:
+            return False
+
+        excess_bytes = self._bytes + size - self.max_bytes
+        excess_count = 0
+        if self.max_records is not None:
+            excess_count = self._count + 1 - self.max_records
+        if excess_bytes <= 0 and excess_count <= 0:
+            return True
+
+        if self.eviction == 'drop_newest' or self._count == 0:
+            return False
+        self._evict_oldest(excess_count, excess_bytes)
+        return True
+
+    def _evict_oldest(self, min_count: int, min_bytes: int):
+        """Drop the fewest oldest records freeing `min_count` slots and `min_bytes` bytes"""
+        count = size = 0
+        last_id = None
+        for record_id, record_size in self._conn.execute(
+                "SELECT id, size FROM records ORDER BY id"):
+            if count >= min_count and size >= min_bytes:
+                break
+            count += 1
+            size += record_size
+            last_id = record_id
+
+        self._begin()
+        self._conn.execute("DELETE FROM records WHERE id <= ?", (last_id,))
+        self._count -= count
+        self._bytes -= size
+        self._stats['evicted'] += count
+        logger.warning(f"Buffer full, evicted {count} oldest records")
+
+    def _begin(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+
+    def _maybe_sync(self):
+        """Commit once enough writes are pending or the sync interval elapsed"""
+        if (self._pending_writes >= self.sync_batch or
+                time.monotonic() - self._last_sync >= self.sync_interval):
+            self.flush()
+
+    def flush(self):
+        """Commit pending writes to disk"""
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+            self._stats['syncs'] += 1
+        self._pending_writes = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Flush and close the queue database"""
+        self.flush()
+        self._conn.close()
+
+    def oldest_age(self) -> Optional[float]:
+        """Seconds since the oldest queued record was stored, or None if empty"""
+        row = self._conn.execute(
+            "SELECT created FROM records ORDER BY id LIMIT 1"
+        ).fetchone()
+        return time.time() - row[0] if row else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics"""
+        return {
+            'records': self._count,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            **self._stats
+        }
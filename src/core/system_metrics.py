@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger('lxpcloud_agent')
+
+class SystemMetricsSampler:
+    """
+    Background sampler for host and agent process metrics
+    psutil is read on a fixed cadence, so CPU utilization and the I/O rates
+    are measured over equal intervals; the collector only copies the latest
+    snapshot. Counters (network, disk I/O) are turned into per-second rates
+    from the delta between two samples
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.interval = config.get('interval', 5.0)
+        self.disk_path = config.get('disk_path', '/')
+
+        try:
+            import psutil
+            self._psutil = psutil
+            self._process = psutil.Process(os.getpid())
+            # Prime the CPU counters; the first interval=None reading is meaningless
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+        except ImportError:
+            self._psutil = None
+            self._process = None
+
+        self._counters: Optional[Dict[str, float]] = None
+        self._counters_at: Optional[float] = None
+        self._snapshot: Dict[str, Dict[str, Any]] = {}
+        self._sampled_at: Optional[float] = None
+        self._running = False
+        self.samples = 0
+
+    async def run(self):
+        """Sample every `interval` seconds until stop() is called"""
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    self.sample()
+                except Exception as e:
+                    # Keep serving the previous snapshot
+                    logger.warning(f"System metrics sampling failed: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latest metrics; sampled inline only when no background sampler runs"""
+        if not self._running and (self._sampled_at is None or
+                                  time.monotonic() - self._sampled_at >= self.interval):
+            self.sample()
+        return dict(self._snapshot)
+
+    def sample(self):
+        """Read psutil once and update the snapshot"""
+        psutil = self._psutil
+        if psutil is None:
+            return
+
+        now = time.monotonic()
+        metrics = {
+            'cpu_usage': self._metric(psutil.cpu_percent(interval=None), '%'),
+            'memory_usage': self._metric(psutil.virtual_memory().percent, '%'),
+            'disk_usage': self._metric(psutil.disk_usage(self.disk_path).percent, '%')
+        }
+
+        counters = {}
+        net = psutil.net_io_counters()
+        if net is not None:
+            counters['net_sent_rate'] = net.bytes_sent
+            counters['net_recv_rate'] = net.bytes_recv
+        disk = psutil.disk_io_counters()
+        if disk is not None:
+            counters['disk_read_rate'] = disk.read_bytes
+            counters['disk_write_rate'] = disk.write_bytes
+
+        if self._counters is not None and now > self._counters_at:
+            elapsed = now - self._counters_at
+            for name, value in counters.items():
+                if name in self._counters:
+                    # Counters can wrap or reset (interface re-created); clamp at zero
+                    rate = max(0.0, value - self._counters[name]) / elapsed
+                    metrics[name] = self._metric(round(rate, 1), 'B/s')
+        self._counters = counters
+        self._counters_at = now
+
+        metrics.update(self._process_metrics())
+
+        self._snapshot = metrics
+        self._sampled_at = now
+        self.samples += 1
+
+    def _process_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Resource usage of the agent process itself"""
+        process = self._process
+        try:
+            with process.oneshot():
+                metrics = {
+                    'agent_cpu': self._metric(process.cpu_percent(interval=None), '%'),
+                    'agent_rss': self._metric(
+                        round(process.memory_info().rss / (1024 * 1024), 2), 'MB'
+                    ),
+                    'agent_threads': self._metric(process.num_threads(), '')
+                }
+                if hasattr(process, 'num_fds'):
+                    metrics['agent_fds'] = self._metric(process.num_fds(), '')
+                return metrics
+        except self._psutil.Error:
+            return {}
+
+    @staticmethod
+    def _metric(value: float, unit: str) -> Dict[str, Any]:
+        return {
+            'value': value,
+            'unit': unit,
+            'status': 'normal'
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampler state"""
+        return {
+            'interval': self.interval,
+            'samples': self.samples,
+            'running': self._running,
+            'age': (time.monotonic() - self._sampled_at) if self._sampled_at is not None else None
+        }
@@ -5,5 +5,7 @@ Hardware interfaces for LXPCloud Device Agent
 from .sensors import SensorInterface, TemperatureSensor, HumiditySensor
 from .gpio_manager import GPIOManager
 from .i2c_manager import I2CManager
+from .driver_executor import DriverExecutor, get_driver_executor, shutdown_driver_executor
 
-__all__ = ['SensorInterface', 'TemperatureSensor', 'HumiditySensor', 'GPIOManager', 'I2CManager'] 
\ No newline at end of file
+__all__ = ['SensorInterface', 'TemperatureSensor', 'HumiditySensor', 'GPIOManager', 'I2CManager',
+           'DriverExecutor', 'get_driver_executor', 'shutdown_driver_executor'] 
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class DriverExecutor:
+    """
+    Runs blocking hardware driver calls off the event loop
+    Calls go to a bounded thread pool and are serialized per bus, so two
+    threads never drive the same GPIO pin or I2C bus at the same time
+    """
+
+    # How often a call queued behind a busy bus checks for its caller giving up
+    LOCK_POLL_INTERVAL = 0.1
+
+    def __init__(self, max_workers: int = 4, bus_wait_timeout: float = 60.0):
+        self.max_workers = max_workers
+        self.bus_wait_timeout = bus_wait_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='lxp-driver'
+        )
+        self._bus_locks: Dict[str, threading.Lock] = {}
+        self._bus_locks_guard = threading.Lock()
+
+    async def run(self, bus: str, func: Callable[..., Any], *args,
+                  timeout: Optional[float] = None) -> Any:
+        """
+        Run func(*args) in the pool while holding the lock for `bus`
+        Raises TimeoutError if the call does not finish within `timeout`;
+        calls that have not started yet are cancelled with the caller
+        """
+        loop = asyncio.get_running_loop()
+        abandoned = threading.Event()
+        future = loop.run_in_executor(
+            self._executor, self._call_locked, bus, func, args, abandoned
+        )
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Driver call on {bus} timed out after {timeout}s")
+        finally:
+            # A call already running cannot be interrupted; a queued one
+            # checks this flag and skips the hardware access
+            abandoned.set()
+
+    def _call_locked(self, bus: str, func: Callable[..., Any], args: tuple,
+                     abandoned: threading.Event) -> Any:
+        lock = self._get_bus_lock(bus)
+        # Give the worker back as soon as the caller stops waiting
+        deadline = time.monotonic() + self.bus_wait_timeout
+        while not lock.acquire(timeout=self.LOCK_POLL_INTERVAL):
+            if abandoned.is_set():
+                return None
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Bus {bus} is busy")
+
+        try:
+            if abandoned.is_set():
+                return None
+            return func(*args)
+        finally:
+            lock.release()
+
+    def _get_bus_lock(self, bus: str) -> threading.Lock:
+        with self._bus_locks_guard:
+            if bus not in self._bus_locks:
+                self._bus_locks[bus] = threading.Lock()
+            return self._bus_locks[bus]
+
+    def shutdown(self):
+        """Stop accepting calls; running driver calls are left to finish"""
+        self._executor.shutdown(wait=False)
+
+_default_executor: Optional[DriverExecutor] = None
+
+def get_driver_executor() -> DriverExecutor:
+    """Shared executor used by the built-in sensors"""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = DriverExecutor()
+    return _default_executor
+
+def shutdown_driver_executor():
+    """Shut down the shared executor; a new one is created on next use"""
+    global _default_executor
+    if _default_executor is not None:
+        _default_executor.shutdown()
+        _default_executor = None
@@ -1,37 +1,48 @@
 import asyncio
 from typing import Dict, Any
 from abc import ABC, abstractmethod
+from .driver_executor import get_driver_executor
+from ..utils.thresholds import CompiledThresholds
 
 class SensorInterface(ABC):
     """Base interface for all sensors"""
     
+    # Budget for one read, overridable per sensor with 'timeout'. The
+    # collector waits this long and driver calls are sized to finish within it
+    DEFAULT_TIMEOUT = 5.0
+    
+    # Adafruit_DHT.read_retry waits this long between attempts
+    DHT_RETRY_DELAY = 2.0
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.pin = config.get('pin', 0)
         self.calibration = config.get('calibration', 0.0)
         self.thresholds = config.get('thresholds', {})
+        self._compiled_thresholds = CompiledThresholds(self.thresholds)
+        self.timeout = config.get('timeout', self.DEFAULT_TIMEOUT)
     
     @abstractmethod
     async def read(self) -> Dict[str, Any]:
         """Read sensor data"""
         pass
     
+    async def _run_driver(self, bus: str, func, *args):
+        """Run a blocking driver call in the driver executor"""
+        executor = get_driver_executor()
+        return await executor.run(bus, func, *args, timeout=self.timeout)
+    
+    def _dht_retries(self) -> int:
+        """read_retry attempts that fit in the read timeout, so the bus is free once it expires"""
+        return max(1, int(self.timeout // self.DHT_RETRY_DELAY))
+    
     def _apply_calibration(self, value: float) -> float:
         """Apply calibration offset to sensor value"""
         return value + self.calibration
     
     def _determine_status(self, value: float) -> str:
         """Determine status based on thresholds"""
-        if 'critical_high' in self.thresholds and value > self.thresholds['critical_high']:
-            return 'critical'
-        elif 'warning_high' in self.thresholds and value > self.thresholds['warning_high']:
-            return 'warning'
-        elif 'warning_low' in self.thresholds and value < self.thresholds['warning_low']:
-            return 'warning'
-        elif 'critical_low' in self.thresholds and value < self.thresholds['critical_low']:
-            return 'critical'
-        else:
-            return 'normal'
+        return self._compiled_thresholds.classify(value)
 
 class TemperatureSensor(SensorInterface):
     """Temperature sensor implementation"""
@@ -60,11 +71,16 @@ class TemperatureSensor(SensorInterface):
         """Read from DHT22 sensor"""
         try:
             import Adafruit_DHT
-            sensor = Adafruit_DHT.DHT22
-            humidity, temperature = Adafruit_DHT.read_retry(sensor, self.pin)
-            return temperature if temperature is not None else 25.0
         except ImportError:
             raise ImportError("DHT library not available")
+        
+        # read_retry blocks for seconds, so it runs off the event loop
+        sensor = Adafruit_DHT.DHT22
+        humidity, temperature = await self._run_driver(
+            f"gpio:{self.pin}", Adafruit_DHT.read_retry, sensor, self.pin,
+            self._dht_retries(), self.DHT_RETRY_DELAY
+        )
+        return temperature if temperature is not None else 25.0
     
     async def _read_simulated(self) -> float:
         """Simulated temperature reading"""
@@ -99,11 +115,15 @@ class HumiditySensor(SensorInterface):
         """Read from DHT22 sensor"""
         try:
             import Adafruit_DHT
-            sensor = Adafruit_DHT.DHT22
-            humidity, temperature = Adafruit_DHT.read_retry(sensor, self.pin)
-            return humidity if humidity is not None else 50.0
         except ImportError:
             raise ImportError("DHT library not available")
+        
+        sensor = Adafruit_DHT.DHT22
+        humidity, temperature = await self._run_driver(
+            f"gpio:{self.pin}", Adafruit_DHT.read_retry, sensor, self.pin,
+            self._dht_retries(), self.DHT_RETRY_DELAY
+        )
+        return humidity if humidity is not None else 50.0
     
     async def _read_simulated(self) -> float:
         """Simulated humidity reading"""
@@ -135,15 +155,22 @@ class PressureSensor(SensorInterface):
         """Read from BMP280 sensor"""
         try:
             import smbus2
-            bus = smbus2.SMBus(1)
-            # BMP280 I2C address
-            address = 0x76
-            # Read pressure data
-            data = bus.read_i2c_block_data(address, 0xF7, 3)
-            pressure = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
-            return pressure / 256.0
         except ImportError:
             raise ImportError("SMBus library not available")
+        
+        def read_block():
+            bus = smbus2.SMBus(1)
+            try:
+                # BMP280 I2C address
+                address = 0x76
+                # Read pressure data
+                return bus.read_i2c_block_data(address, 0xF7, 3)
+            finally:
+                bus.close()
+        
+        data = await self._run_driver("i2c:1", read_block)
+        pressure = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
+        return pressure / 256.0
     
     async def _read_simulated(self) -> float:
         """Simulated pressure reading"""
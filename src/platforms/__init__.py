@@ -2,7 +2,11 @@
 Platform-specific implementations for LXPCloud Device Agent
 """
 
-from .raspberry_pi import RaspberryPiPlatform
+try:
+    from .raspberry_pi import RaspberryPiPlatform
+except ImportError:
+    # RPi.GPIO and smbus only exist on Raspberry Pi hardware
+    RaspberryPiPlatform = None
 from .arduino import ArduinoPlatform
 from .esp32 import ESP32Platform
 from .generic import GenericPlatform
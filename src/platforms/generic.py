@@ -23,7 +23,8 @@ class GenericPlatform:
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get system metrics"""
         return {
-            'cpu_percent': psutil.cpu_percent(interval=1),
+            # Utilization since the previous call; interval=1 would block for a second
+            'cpu_percent': psutil.cpu_percent(interval=None),
             'memory_percent': psutil.virtual_memory().percent,
             'disk_percent': psutil.disk_usage('/').percent,
             'network_io': psutil.net_io_counters()._asdict()
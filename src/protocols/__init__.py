@@ -2,7 +2,13 @@
 Protocol implementations for LXPCloud Device Agent
 """
 
-from .lxp_protocol import LXPProtocol
+from .lxp_protocol import LXPProtocol, CompiledFormatter
 from .json_formatter import JSONFormatter
+from .compression import PayloadCompressor
+from .encoding import JSONCodec, MessagePackCodec, CBORCodec, get_codec, negotiate_codec
+from .delta import SessionDeltaEncoder
+from .columnar import ColumnarBatchEncoder
 
-__all__ = ['LXPProtocol', 'JSONFormatter'] 
\ No newline at end of file
+__all__ = ['LXPProtocol', 'CompiledFormatter', 'JSONFormatter', 'PayloadCompressor',
+           'JSONCodec', 'MessagePackCodec', 'CBORCodec', 'get_codec', 'negotiate_codec',
+           'SessionDeltaEncoder', 'ColumnarBatchEncoder'] 
\ No newline at end of file
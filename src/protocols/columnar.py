@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+class ColumnarBatchEncoder:
+    """
+    Columnar encoding of a batch of LXP documents from one device
+    Every sensor and metric becomes a series of parallel time/value arrays;
+    units are hoisted per series and statuses, metadata and the status
+    block are run-length encoded, so unchanged values are sent once
+    """
+
+    FORMAT = 'columnar'
+
+    def encode(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Encode LXP documents (as built by LXPProtocol.format_data)"""
+        if not records:
+            raise ValueError("Cannot encode an empty batch")
+
+        times = [self._time_ms(record) for record in records]
+        base_time = min(times)
+
+        series: Dict[str, Dict[str, Any]] = {}
+        alarms = []
+        status_runs = []
+        metadata_runs = []
+
+        for record, time_ms in zip(records, times):
+            offset = time_ms - base_time
+            data = record.get('data', {})
+
+            for group in ('sensors', 'metrics'):
+                for name, reading in data.get(group, {}).items():
+                    self._append(series, f"{group}.{name}", offset, reading)
+
+            for alarm in data.get('alarms', []):
+                alarm = dict(alarm)
+                alarm['t'] = offset
+                alarms.append(alarm)
+
+            self._append_run(status_runs, offset, data.get('status'))
+            self._append_run(metadata_runs, offset, record.get('metadata'))
+
+        return {
+            'format': self.FORMAT,
+            'lxp_version': records[0].get('lxp_version'),
+            'device_info': records[0].get('device_info'),
+            'count': len(records),
+            'base_time': base_time,
+            'series': series,
+            'alarms': alarms,
+            'status': status_runs,
+            'metadata': metadata_runs
+        }
+
+    @staticmethod
+    def _time_ms(record: Dict[str, Any]) -> int:
+        """Millisecond timestamp, from the ISO field when it carries sub-seconds"""
+        timestamp = record.get('timestamp', {})
+        iso = timestamp.get('iso')
+        if iso:
+            try:
+                moment = datetime.fromisoformat(iso.rstrip('Z')).replace(tzinfo=timezone.utc)
+                return int(round(moment.timestamp() * 1000))
+            except ValueError:
+                pass
+        return int(timestamp.get('unix', 0)) * 1000
+
+    @staticmethod
+    def _append(series: Dict[str, Dict[str, Any]], key: str, offset: int,
+                reading: Dict[str, Any]):
+        column = series.get(key)
+        if column is None:
+            column = series[key] = {
+                'unit': reading.get('unit', ''),
+                't': [],
+                'v': [],
+                'status': []
+            }
+            if 'accuracy' in reading:
+                column['accuracy'] = reading['accuracy']
+
+        # Status runs are [position in series, status]
+        status = reading.get('status', 'normal')
+        if not column['status'] or column['status'][-1][1] != status:
+            column['status'].append([len(column['v']), status])
+
+        # Window statistics from aggregation, aligned with 'v'
+        if 'stats' in reading and 'stats' not in column:
+            column['stats'] = [None] * len(column['v'])
+        if 'stats' in column:
+            column['stats'].append(reading.get('stats'))
+
+        column['t'].append(offset)
+        column['v'].append(reading.get('value', 0))
+
+    @staticmethod
+    def _append_run(runs: List[list], offset: int, value: Any):
+        """Runs are [time offset, value], starting a new run only on change"""
+        if value is None:
+            return
+        if not runs or runs[-1][1] != value:
+            runs.append([offset, value])
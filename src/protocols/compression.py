@@ -0,0 +1,93 @@
+import gzip
+import logging
+from typing import Dict, Any, Optional, Tuple, Union
+
+logger = logging.getLogger('lxpcloud_agent')
+
+class PayloadCompressor:
+    """
+    Request body compression for the LXPCloud API
+    Configured by data_collection.compression, either a boolean or a dict
+    with 'algorithm' (gzip or zstd), 'min_size', 'level' and 'dictionary'
+    """
+
+    def __init__(self, config: Union[bool, Dict[str, Any], None] = None):
+        if not isinstance(config, dict):
+            config = {'enabled': bool(config)}
+
+        self.enabled = config.get('enabled', True)
+        self.algorithm = config.get('algorithm', 'gzip')
+        self.min_size = config.get('min_size', 1024)
+        self.level = config.get('level')
+        self.dictionary_path = config.get('dictionary')
+
+        self._zstd = None
+        self._stats = {
+            'compressed': 0,
+            'skipped': 0,
+            'bytes_in': 0,
+            'bytes_out': 0
+        }
+
+        if self.algorithm not in ('gzip', 'zstd'):
+            raise ValueError(f"Unknown compression algorithm: {self.algorithm}")
+        if self.enabled and self.algorithm == 'zstd':
+            self._init_zstd()
+
+    def _init_zstd(self):
+        """Create the zstd compressor, optionally with a pre-trained dictionary"""
+        try:
+            import zstandard
+        except ImportError:
+            logger.warning("zstandard not available - falling back to gzip")
+            self.algorithm = 'gzip'
+            return
+
+        dict_data = None
+        if self.dictionary_path:
+            with open(self.dictionary_path, 'rb') as f:
+                dict_data = zstandard.ZstdCompressionDict(f.read())
+
+        # The dictionary ID is written into each frame so the server can
+        # pick the matching dictionary for decompression
+        self._zstd = zstandard.ZstdCompressor(
+            level=self.level if self.level is not None else 3,
+            dict_data=dict_data,
+            write_dict_id=True
+        )
+
+    def compress(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """
+        Compress a request body
+        Returns the body to send and its Content-Encoding, or None if it
+        was left uncompressed (disabled, below min_size or no gain)
+        """
+        if not self.enabled or len(body) < self.min_size:
+            self._stats['skipped'] += 1
+            return body, None
+
+        if self._zstd is not None:
+            compressed = self._zstd.compress(body)
+            encoding = 'zstd'
+        else:
+            level = self.level if self.level is not None else 6
+            compressed = gzip.compress(body, compresslevel=level)
+            encoding = 'gzip'
+
+        if len(compressed) >= len(body):
+            self._stats['skipped'] += 1
+            return body, None
+
+        self._stats['compressed'] += 1
+        self._stats['bytes_in'] += len(body)
+        self._stats['bytes_out'] += len(compressed)
+        return compressed, encoding
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get compression statistics"""
+        stats = dict(self._stats)
+        stats['algorithm'] = self.algorithm
+        stats['ratio'] = (
+            stats['bytes_out'] / stats['bytes_in'] if stats['bytes_in'] else 1.0
+        )
+        return stats
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import uuid
+from typing import Dict, Any, Iterable, Tuple
+
+class SessionDeltaEncoder:
+    """
+    Session-level delta encoding of static LXP document sections
+    Sections that rarely change are replaced by {"$ref": <hash>} and sent in
+    full only until the server has acknowledged a request carrying them
+    """
+
+    STATIC_SECTIONS = (
+        ('device_info',),
+        ('metadata', 'location'),
+        ('metadata', 'environment'),
+        ('metadata', 'network'),
+        ('data', 'status')
+    )
+
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex
+        self._confirmed = set()
+        # Last section seen per path, to skip re-hashing unchanged sections
+        self._last_seen: Dict[Tuple[str, ...], Tuple[Any, str]] = {}
+
+    def encode_record(self, record: Dict[str, Any],
+                      static: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return a copy of record with static sections replaced by references
+        Sections the server has not confirmed yet are added to `static`
+        """
+        encoded = dict(record)
+        for path in self.STATIC_SECTIONS:
+            parent = encoded
+            for key in path[:-1]:
+                if not isinstance(parent.get(key), dict):
+                    parent = None
+                    break
+                # Copy containers on the way down so the record is untouched
+                parent[key] = dict(parent[key])
+                parent = parent[key]
+
+            if parent is None or path[-1] not in parent:
+                continue
+
+            section = parent[path[-1]]
+            section_hash = self._hash_section(path, section)
+            if section_hash not in self._confirmed:
+                static[section_hash] = section
+            parent[path[-1]] = {'$ref': section_hash}
+
+        return encoded
+
+    def _hash_section(self, path: Tuple[str, ...], section: Any) -> str:
+        last = self._last_seen.get(path)
+        if last is not None and last[0] == section:
+            return last[1]
+
+        canonical = json.dumps(section, sort_keys=True, separators=(',', ':'))
+        section_hash = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+        self._last_seen[path] = (section, section_hash)
+        return section_hash
+
+    def confirm(self, section_hashes: Iterable[str]):
+        """Mark sections as known to the server after a successful request"""
+        self._confirmed.update(section_hashes)
+
+    def reset(self):
+        """Start a new session; every section is sent in full again"""
+        self.session_id = uuid.uuid4().hex
+        self._confirmed.clear()
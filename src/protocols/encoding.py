@@ -0,0 +1,153 @@
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+
+class JSONCodec:
+    """JSON wire encoding, always available"""
+
+    name = 'json'
+    content_type = 'application/json'
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def encode_records_body(self, fields: Dict[str, Any], items: List[bytes]) -> bytes:
+        """Encode a request map whose 'records' array holds pre-encoded items"""
+        head = self.encode(fields)[:-1]
+        separator = b',' if fields else b''
+        return head + separator + b'"records":[' + b','.join(items) + b']}'
+
+class _BinaryCodec(ABC):
+    """Shared framing for binary codecs with map and array headers"""
+
+    name = ''
+    content_type = ''
+
+    @abstractmethod
+    def encode(self, data: Any) -> bytes:
+        """Encode a value"""
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decode a complete document"""
+        pass
+
+    @abstractmethod
+    def _map_header(self, size: int) -> bytes:
+        """Header of a map with `size` entries"""
+        pass
+
+    @abstractmethod
+    def _array_header(self, size: int) -> bytes:
+        """Header of an array with `size` items"""
+        pass
+
+    def encode_records_body(self, fields: Dict[str, Any], items: List[bytes]) -> bytes:
+        """Encode a request map whose 'records' array holds pre-encoded items"""
+        parts = [self._map_header(len(fields) + 1)]
+        for key, value in fields.items():
+            parts.append(self.encode(key))
+            parts.append(self.encode(value))
+        parts.append(self.encode('records'))
+        parts.append(self._array_header(len(items)))
+        parts.extend(items)
+        return b''.join(parts)
+
+class MessagePackCodec(_BinaryCodec):
+    """MessagePack wire encoding (requires msgpack)"""
+
+    name = 'msgpack'
+    content_type = 'application/msgpack'
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def encode(self, data: Any) -> bytes:
+        return self._msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+    def _map_header(self, size: int) -> bytes:
+        return self._header(size, 0x80, 0xde, 0xdf)
+
+    def _array_header(self, size: int) -> bytes:
+        return self._header(size, 0x90, 0xdc, 0xdd)
+
+    @staticmethod
+    def _header(size: int, fix: int, marker16: int, marker32: int) -> bytes:
+        if size < 16:
+            return bytes([fix | size])
+        if size < 0x10000:
+            return struct.pack('>BH', marker16, size)
+        return struct.pack('>BI', marker32, size)
+
+class CBORCodec(_BinaryCodec):
+    """CBOR (RFC 8949) wire encoding (requires cbor2)"""
+
+    name = 'cbor'
+    content_type = 'application/cbor'
+
+    def __init__(self):
+        import cbor2
+        self._cbor2 = cbor2
+
+    def encode(self, data: Any) -> bytes:
+        return self._cbor2.dumps(data)
+
+    def decode(self, data: bytes) -> Any:
+        return self._cbor2.loads(data)
+
+    def _map_header(self, size: int) -> bytes:
+        return self._header(5, size)
+
+    def _array_header(self, size: int) -> bytes:
+        return self._header(4, size)
+
+    @staticmethod
+    def _header(major: int, size: int) -> bytes:
+        major <<= 5
+        if size < 24:
+            return bytes([major | size])
+        if size < 0x100:
+            return struct.pack('>BB', major | 24, size)
+        if size < 0x10000:
+            return struct.pack('>BH', major | 25, size)
+        return struct.pack('>BI', major | 26, size)
+
+CODECS = {
+    'json': JSONCodec,
+    'msgpack': MessagePackCodec,
+    'cbor': CBORCodec
+}
+
+def get_codec(name: str) -> Optional[Any]:
+    """Create a codec by name, or None if its library is not installed"""
+    if name not in CODECS:
+        raise ValueError(f"Unknown encoding: {name}")
+    try:
+        return CODECS[name]()
+    except ImportError:
+        return None
+
+def available_encodings(preferred: List[str]) -> List[str]:
+    """Filter preferred encodings down to those usable on this device"""
+    return [name for name in preferred if get_codec(name) is not None]
+
+def negotiate_codec(preferred: List[str], server_encodings: Optional[List[str]]):
+    """
+    Pick the first preferred encoding that the server accepts
+    Falls back to JSON if the server did not advertise any or none match
+    """
+    for name in preferred:
+        if server_encodings and name in server_encodings:
+            codec = get_codec(name)
+            if codec is not None:
+                return codec
+    return JSONCodec()
@@ -1,9 +1,15 @@
 import json
 import time
-from datetime import datetime
-from typing import Dict, Any, List
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
 import uuid
 
+from ..utils.thresholds import CompiledThresholds
+
+def default_device_id() -> str:
+    """Device ID derived from the hardware address, stable across records and restarts"""
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, str(uuid.getnode())))
+
 class LXPProtocol:
     """
     LXPCloud Custom Protocol Implementation
@@ -22,11 +28,12 @@ class LXPProtocol:
         """
         try:
             # Create base structure
+            timestamp = self._format_timestamp(raw_data.get('timestamp') or time.time())
             formatted_data = {
                 "lxp_version": self.version,
                 "device_info": self._format_device_info(device_info),
-                "timestamp": self._format_timestamp(),
-                "data": self._format_sensor_data(raw_data),
+                "timestamp": timestamp,
+                "data": self._format_sensor_data(raw_data, timestamp['unix']),
                 "metadata": self._format_metadata(raw_data)
             }
             
@@ -38,64 +45,88 @@ class LXPProtocol:
         except Exception as e:
             raise ValueError(f"Data formatting failed: {e}")
     
+    def compile(self, device_info: Dict[str, Any]) -> 'CompiledFormatter':
+        """Build a fast formatter for one device; see CompiledFormatter"""
+        return CompiledFormatter(self, device_info)
+    
     def _format_device_info(self, device_info: Dict[str, Any]) -> Dict[str, Any]:
         """Format device information"""
         return {
-            "device_id": device_info.get('device_id', str(uuid.uuid4())),
+            "device_id": device_info.get('device_id') or default_device_id(),
             "device_type": device_info.get('type', 'unknown'),
             "firmware_version": device_info.get('firmware_version', '1.0.0'),
             "hardware_version": device_info.get('hardware_version', '1.0.0')
         }
     
-    def _format_timestamp(self) -> Dict[str, Any]:
-        """Format timestamp information"""
-        now = datetime.utcnow()
+    @staticmethod
+    def _format_timestamp(now: float) -> Dict[str, Any]:
+        """Format timestamp information from one wall-clock reading"""
         return {
-            "unix": int(now.timestamp()),
-            "iso": now.isoformat() + "Z",
+            "unix": int(now),
+            "iso": datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat() + "Z",
             "timezone": "UTC"
         }
     
-    def _format_sensor_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Format sensor data"""
-        formatted = {
-            "sensors": {},
-            "metrics": {},
-            "alarms": [],
-            "status": {
-                "operational": True,
-                "maintenance_required": False,
-                "last_maintenance": None
-            }
+    def _format_sensor_data(self, raw_data: Dict[str, Any],
+                            timestamp: Optional[int] = None) -> Dict[str, Any]:
+        """Format sensor data; alarms without a time get the record's `timestamp`"""
+        if timestamp is None:
+            timestamp = int(time.time())
+        return {
+            "sensors": self._format_sensors(raw_data),
+            "metrics": self._format_metrics(raw_data),
+            "alarms": self._format_alarms(raw_data, timestamp),
+            "status": self._format_status()
         }
-        
-        # Process sensors
+    
+    def _format_sensors(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format sensor readings"""
+        sensors = {}
         for sensor_name, sensor_data in raw_data.get('sensors', {}).items():
-            formatted["sensors"][sensor_name] = {
+            sensors[sensor_name] = {
                 "value": sensor_data.get('value', 0),
                 "unit": sensor_data.get('unit', ''),
                 "accuracy": sensor_data.get('accuracy', 0),
                 "status": self._determine_status(sensor_data)
             }
-        
-        # Process metrics
+            if 'stats' in sensor_data:
+                sensors[sensor_name]["stats"] = sensor_data['stats']
+        return sensors
+    
+    def _format_metrics(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format system metrics"""
+        metrics = {}
         for metric_name, metric_data in raw_data.get('metrics', {}).items():
-            formatted["metrics"][metric_name] = {
+            metrics[metric_name] = {
                 "value": metric_data.get('value', 0),
                 "unit": metric_data.get('unit', ''),
                 "status": self._determine_status(metric_data)
             }
-        
-        # Process alarms
-        for alarm in raw_data.get('alarms', []):
-            formatted["alarms"].append({
+            if 'stats' in metric_data:
+                metrics[metric_name]["stats"] = metric_data['stats']
+        return metrics
+    
+    def _format_alarms(self, raw_data: Dict[str, Any], timestamp: int) -> List[Dict[str, Any]]:
+        """Format alarm transitions"""
+        return [
+            {
                 "id": alarm.get('id', 'UNKNOWN'),
                 "severity": alarm.get('severity', 'info'),
+                "state": alarm.get('state', 'raised'),
                 "message": alarm.get('message', ''),
-                "timestamp": int(datetime.utcnow().timestamp())
-            })
-        
-        return formatted
+                "value": alarm.get('value'),
+                "timestamp": alarm.get('timestamp', timestamp)
+            }
+            for alarm in raw_data.get('alarms', [])
+        ]
+    
+    def _format_status(self) -> Dict[str, Any]:
+        """Format the device status block"""
+        return {
+            "operational": True,
+            "maintenance_required": False,
+            "last_maintenance": None
+        }
     
     def _format_metadata(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Format metadata information"""
@@ -107,19 +138,13 @@ class LXPProtocol:
     
     def _determine_status(self, data: Dict[str, Any]) -> str:
         """Determine status based on data values and thresholds"""
-        value = data.get('value', 0)
-        thresholds = data.get('thresholds', {})
+        # Readings classified at the source (sensors, aggregation windows,
+        # failed and stale reads) keep their status
+        if 'status' in data:
+            return data['status']
         
-        if 'critical_high' in thresholds and value > thresholds['critical_high']:
-            return 'critical'
-        elif 'warning_high' in thresholds and value > thresholds['warning_high']:
-            return 'warning'
-        elif 'warning_low' in thresholds and value < thresholds['warning_low']:
-            return 'warning'
-        elif 'critical_low' in thresholds and value < thresholds['critical_low']:
-            return 'critical'
-        else:
-            return 'normal'
+        thresholds = CompiledThresholds(data.get('thresholds'))
+        return thresholds.classify(data.get('value', 0))
     
     def _validate_data(self, data: Dict[str, Any]):
         """Validate formatted data structure"""
@@ -142,4 +167,71 @@ class LXPProtocol:
         try:
             return json.loads(response_data)
         except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON response: {e}") 
\ No newline at end of file
+            raise ValueError(f"Invalid JSON response: {e}")
+
+class CompiledFormatter:
+    """
+    LXPProtocol formatter bound to one device
+    The envelope (version, device_info) and the status block are built and
+    validated once and shared by every record, so each record only fills in
+    its timestamp, readings and metadata. The output is not revalidated since
+    its structure is fixed. Sections are built by the same helpers as
+    LXPProtocol.format_data
+    """
+    
+    def __init__(self, protocol: LXPProtocol, device_info: Dict[str, Any]):
+        self.protocol = protocol
+        self.version = protocol.version
+        self.device_info = protocol._format_device_info(device_info)
+        if not self.device_info.get('device_id'):
+            raise ValueError("Device ID is required")
+        self._status = protocol._format_status()
+        # Key order matches LXPProtocol.format_data; copied per record
+        self._envelope = {
+            "lxp_version": self.version,
+            "device_info": self.device_info,
+            "timestamp": None,
+            "data": None,
+            "metadata": None
+        }
+        self._format_sensors = protocol._format_sensors
+        self._format_metrics = protocol._format_metrics
+        self._format_alarms = protocol._format_alarms
+        self._format_metadata = protocol._format_metadata
+    
+    def format(self, raw_data: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+        """Format one raw sample; `now` defaults to its collection time"""
+        if now is None:
+            now = raw_data.get('timestamp') or time.time()
+        return self._format(raw_data, LXPProtocol._format_timestamp(now))
+    
+    def format_batch(self, samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Format several raw samples, each with its own collection time
+        Samples collected at the same time share one timestamp block
+        """
+        format_record = self._format
+        format_timestamp = LXPProtocol._format_timestamp
+        fallback = time.time()
+        last_now = None
+        timestamp = None
+        formatted = []
+        for raw_data in samples:
+            now = raw_data.get('timestamp') or fallback
+            if now != last_now:
+                timestamp = format_timestamp(now)
+                last_now = now
+            formatted.append(format_record(raw_data, timestamp))
+        return formatted
+    
+    def _format(self, raw_data: Dict[str, Any], timestamp: Dict[str, Any]) -> Dict[str, Any]:
+        record = self._envelope.copy()
+        record["timestamp"] = timestamp
+        record["data"] = {
+            "sensors": self._format_sensors(raw_data),
+            "metrics": self._format_metrics(raw_data),
+            "alarms": self._format_alarms(raw_data, timestamp['unix']),
+            "status": self._status
+        }
+        record["metadata"] = self._format_metadata(raw_data)
+        return record
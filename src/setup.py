@@ -55,6 +55,14 @@ def main():
                 "warning_high": 35,
                 "critical_low": 10,
                 "critical_high": 40
+            },
+            "deadband": {
+                "absolute": 0.2,
+                "max_silence": 300
+            },
+            "alarm": {
+                "hysteresis": 0.5,
+                "min_duration": 0
             }
         }
     
@@ -73,6 +81,14 @@ def main():
                 "warning_high": 70,
                 "critical_low": 20,
                 "critical_high": 80
+            },
+            "deadband": {
+                "percent": 1.0,
+                "max_silence": 300
+            },
+            "alarm": {
+                "hysteresis": 2.0,
+                "min_duration": 0
             }
         }
     
@@ -88,7 +104,17 @@ def main():
             "api_key": api_key,
             "timeout": 30,
             "retry_attempts": 3,
-            "batch_size": 10
+            "batch_size": 10,
+            "batch_mode": True,
+            "batch_max_bytes": 262144,
+            "max_in_flight": 4,
+            "encoding": ["msgpack", "cbor", "json"],
+            "delta_encoding": False,
+            "batch_format": "records",
+            "pool_size": 8,
+            "keepalive_timeout": 60,
+            "dns_cache_ttl": 300,
+            "idle_reconnect": 300
         },
         "device": {
             "name": device_name,
@@ -104,7 +130,79 @@ def main():
             "batch_size": 10,
             "compression": True,
             "encryption": False,
-            "max_retries": 3
+            "max_retries": 3,
+            "flush": {
+                "max_bytes": 65536,
+                "max_age": 60,
+                "adaptive": True,
+                "max_batch_size": 80
+            },
+            "system_metrics": {
+                "interval": 5,
+                "disk_path": "/"
+            },
+            "metrics_deadband": {
+                "percent": 5.0,
+                "max_silence": 300
+            },
+            "aggregation": {
+                "enabled": False,
+                "window": 60,
+                "percentiles": [50, 95],
+                "capacity": 4096
+            }
+        },
+        "alarm_lane": {
+            "enabled": True,
+            "queue_size": 100,
+            "retry": {
+                "max_attempts": 3,
+                "base_delay": 0.2,
+                "max_delay": 2.0,
+                "budget_ratio": 0.5,
+                "budget_capacity": 5
+            }
+        },
+        "metrics": {
+            "enabled": False,
+            "host": "127.0.0.1",
+            "port": 9464,
+            "loop_lag_interval": 1.0
+        },
+        "tracing": {
+            "enabled": False,
+            "exporter": "ring",
+            "capacity": 2048,
+            "path": "/var/log/lxpcloud-agent/trace.jsonl",
+            "max_size": "10MB",
+            "backup_count": 1,
+            "dump_path": "/tmp/lxpcloud-agent-trace.jsonl",
+            "dump_on_overrun": True,
+            "dump_min_interval": 60
+        },
+        "buffer": {
+            "path": "/var/lib/lxpcloud-agent/buffer.db",
+            "max_size": "100MB",
+            "eviction": "drop_oldest",
+            "sync_batch": 50,
+            "sync_interval": 1.0,
+            "max_rejections": 3,
+            "dead_letter_max_records": 1000
+        },
+        "retry": {
+            "base_delay": 1.0,
+            "max_delay": 30.0,
+            "budget_ratio": 0.2,
+            "budget_capacity": 10,
+            "failure_threshold": 5,
+            "reset_timeout": 30,
+            "max_reset_timeout": 600
+        },
+        "pipeline": {
+            "queue_size": 100,
+            "backpressure": "drop_oldest",
+            "spill_path": "/var/lib/lxpcloud-agent/spill.db",
+            "spill_max_size": "20MB"
         },
         "sensors": sensors,
         "logging": {
@@ -120,6 +218,15 @@ def main():
             "ethernet_priority": True,
             "connection_timeout": 30
         },
+        "metadata": {
+            "ttl": {
+                "location": 3600,
+                "environment": 60,
+                "network": 300
+            },
+            "resolve_timeout": 2.0,
+            "fingerprint_interval": 5.0
+        },
         "location": {
             "latitude": 41.0082,
             "longitude": 28.9784,
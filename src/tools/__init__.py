@@ -0,0 +1,7 @@
+"""
+Development tools for LXPCloud Device Agent
+"""
+
+from .stub_server import StubServer
+
+__all__ = ['StubServer']
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Local LXPCloud stand-in server
+Implements the machine.php endpoint (test=1 probe, single and batch data
+POSTs) with configurable fault injection, for load and failure testing
+without the real cloud
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, Any, Optional
+
+from aiohttp import web
+
+from ..protocols.encoding import CODECS, get_codec
+
+DEFAULT_FAULTS = {
+    'latency': 0.0,          # seconds added to every response
+    'jitter': 0.0,           # extra uniform random latency, seconds
+    'error_rate': 0.0,       # probability of a 500 response
+    'reset_rate': 0.0,       # probability of dropping the connection
+    'record_error_rate': 0.0,  # probability of rejecting a record in a batch
+    'burst_every': 0.0,      # seconds between 503 bursts (0 disables)
+    'burst_duration': 0.0,   # length of each burst, seconds
+    'slow_body_rate': 0.0,   # response body bytes per second (0 = unthrottled)
+    'max_bytes_per_s': 0.0   # request throughput cap across all clients
+}
+
+class StubServer:
+    """
+    machine.php stand-in with fault injection
+    Faults are read from `faults` on every request, so they can be changed
+    while the server runs. Counters are available from get_stats()
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080,
+                 endpoint: str = '/machine.php', faults: Optional[Dict[str, Any]] = None,
+                 seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.endpoint = endpoint
+        self.faults = dict(DEFAULT_FAULTS)
+        self.faults.update(faults or {})
+        self.encodings = [name for name in CODECS if get_codec(name) is not None]
+        self.modes = ['single', 'batch', 'columnar']
+
+        self._random = random.Random(seed)
+        self._started_at = time.monotonic()
+        self._link_free_at = 0.0
+        self._runner: Optional[web.AppRunner] = None
+
+        self.stats = {
+            'requests': 0,
+            'probes': 0,
+            'records': 0,
+            'records_rejected': 0,
+            'bytes_received': 0,
+            'errors_injected': 0,
+            'bursts_injected': 0,
+            'resets_injected': 0
+        }
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route('*', self.endpoint, self._handle)
+        return app
+
+    async def start(self):
+        """Start listening; port 0 picks a free port, stored in self.port"""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        self._started_at = time.monotonic()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.stats['requests'] += 1
+        faults = self.faults
+
+        if request.method == 'GET' and request.query.get('test') == '1':
+            self.stats['probes'] += 1
+            return await self._respond(request, {
+                'status': 'ok',
+                'encodings': self.encodings,
+                'modes': self.modes
+            })
+
+        if request.method != 'POST':
+            return web.json_response({'status': 'error', 'error': 'Method not allowed'}, status=405)
+
+        body = await request.read()
+        size = request.content_length or len(body)
+        self.stats['bytes_received'] += size
+        await self._throttle(size)
+
+        if self._chance(faults['reset_rate']):
+            self.stats['resets_injected'] += 1
+            # The response below is never delivered; the client sees a reset
+            request.transport.abort()
+            return web.Response(status=500)
+
+        if self._in_burst():
+            self.stats['bursts_injected'] += 1
+            return await self._respond(request, {'status': 'error', 'error': 'Service unavailable'}, 503)
+
+        if self._chance(faults['error_rate']):
+            self.stats['errors_injected'] += 1
+            return await self._respond(request, {'status': 'error', 'error': 'Injected failure'}, 500)
+
+        try:
+            payload = self._decode(request, body)
+        except Exception as e:
+            return await self._respond(request, {'status': 'error', 'error': f"Bad request: {e}"}, 400)
+
+        return await self._respond(request, self._accept(payload))
+
+    def _decode(self, request: web.Request, body: bytes) -> Dict[str, Any]:
+        # Content-Encoding is undone by aiohttp (zstd needs an aiohttp build
+        # with zstd support, otherwise the request is rejected with 400)
+        content_type = request.headers.get('Content-Type', 'application/json').split(';')[0]
+        for name in CODECS:
+            codec = get_codec(name)
+            if codec is not None and codec.content_type == content_type:
+                return codec.decode(body)
+        raise ValueError(f"Unsupported content type {content_type}")
+
+    def _accept(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Acknowledge a data POST, rejecting records at record_error_rate"""
+        mode = payload.get('mode')
+        if mode == 'batch':
+            count = len(payload.get('records', []))
+        elif mode == 'columnar':
+            count = payload.get('batch', {}).get('count', 0)
+        else:
+            self.stats['records'] += 1
+            return {'status': 'ok'}
+
+        results = []
+        for index in range(count):
+            rejected = self._chance(self.faults['record_error_rate'])
+            results.append({'index': index, 'status': 'error' if rejected else 'ok'})
+            self.stats['records_rejected' if rejected else 'records'] += 1
+        return {'status': 'ok', 'results': results}
+
+    async def _respond(self, request: web.Request, data: Dict[str, Any],
+                       status: int = 200) -> web.StreamResponse:
+        """Send a JSON response after the configured latency, optionally trickled"""
+        faults = self.faults
+        delay = faults['latency'] + self._random.uniform(0, faults['jitter'])
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if faults['slow_body_rate'] <= 0:
+            return web.json_response(data, status=status)
+
+        body = web.json_response(data).body
+        response = web.StreamResponse(status=status, headers={'Content-Type': 'application/json'})
+        response.content_length = len(body)
+        await response.prepare(request)
+        chunk = max(1, int(faults['slow_body_rate'] / 10))
+        for offset in range(0, len(body), chunk):
+            await response.write(body[offset:offset + chunk])
+            await asyncio.sleep(len(body[offset:offset + chunk]) / faults['slow_body_rate'])
+        await response.write_eof()
+        return response
+
+    async def _throttle(self, size: int):
+        """Delay requests so the shared link never exceeds max_bytes_per_s"""
+        rate = self.faults['max_bytes_per_s']
+        if rate <= 0:
+            return
+        now = time.monotonic()
+        self._link_free_at = max(self._link_free_at, now) + size / rate
+        await asyncio.sleep(self._link_free_at - now)
+
+    def _in_burst(self) -> bool:
+        every = self.faults['burst_every']
+        if every <= 0:
+            return False
+        return (time.monotonic() - self._started_at) % every < self.faults['burst_duration']
+
+    def _chance(self, probability: float) -> bool:
+        return probability > 0 and self._random.random() < probability
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request, record and injected fault counters"""
+        return dict(self.stats)
+
+async def serve(server: StubServer):
+    await server.start()
+    print(f"Stub LXPCloud server listening on {server.url}{server.endpoint}")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+        print(f"Stats: {server.get_stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local LXPCloud stand-in with fault injection")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--endpoint', default='/machine.php')
+    parser.add_argument('--seed', type=int, help="random seed for reproducible faults")
+    for name, default in DEFAULT_FAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args()
+
+    faults = {name: getattr(args, name) for name in DEFAULT_FAULTS}
+    server = StubServer(args.host, args.port, args.endpoint, faults, args.seed)
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -5,5 +5,10 @@ Utility functions for LXPCloud Device Agent
 from .logger import setup_logger
 from .validator import DataValidator
 from .crypto import CryptoUtils
+from .thresholds import CompiledThresholds
+from .metrics import REGISTRY, MetricsRegistry, MetricsServer
+from .tracing import span, traced, get_tracer, set_tracer, RecordingTracer, RingBufferExporter, FileExporter
 
-__all__ = ['setup_logger', 'DataValidator', 'CryptoUtils'] 
\ No newline at end of file
+__all__ = ['setup_logger', 'DataValidator', 'CryptoUtils', 'CompiledThresholds',
+           'REGISTRY', 'MetricsRegistry', 'MetricsServer', 'span', 'traced',
+           'get_tracer', 'set_tracer', 'RecordingTracer', 'RingBufferExporter', 'FileExporter'] 
\ No newline at end of file
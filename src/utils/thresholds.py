@@ -0,0 +1,57 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+# Threshold bands in evaluation order: most severe first
+BANDS = (
+    ('critical_high', 'critical', 'high'),
+    ('critical_low', 'critical', 'low'),
+    ('warning_high', 'warning', 'high'),
+    ('warning_low', 'warning', 'low')
+)
+
+SEVERITY_RANK = {'normal': 0, 'warning': 1, 'critical': 2}
+
+class CompiledThresholds:
+    """
+    Sensor thresholds compiled into an ordered list of bands
+    Shared by the sensors, the LXP protocol and the alarm engine so a value
+    is classified the same way everywhere
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, Any]] = None):
+        thresholds = thresholds or {}
+        self.bands: List[Tuple[str, str, str, float]] = [
+            (name, severity, direction, float(thresholds[name]))
+            for name, severity, direction in BANDS
+            if thresholds.get(name) is not None
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.bands)
+
+    def classify(self, value: float) -> str:
+        """Status of a value: 'critical', 'warning' or 'normal'"""
+        return self.match(value)[0]
+
+    def match(self, value: float, active: Optional[str] = None,
+              hysteresis: float = 0.0) -> Tuple[str, Optional[str]]:
+        """
+        Return (status, band name) for a value
+        Bands in the direction of the `active` band and no more severe than
+        it stay matched until the value is `hysteresis` back inside the limit
+        """
+        held_direction = None
+        held_rank = -1
+        for name, severity, direction, _ in self.bands:
+            if name == active:
+                held_direction = direction
+                held_rank = SEVERITY_RANK[severity]
+
+        for name, severity, direction, limit in self.bands:
+            margin = 0.0
+            if direction == held_direction and SEVERITY_RANK[severity] <= held_rank:
+                margin = hysteresis
+            if direction == 'high' and value > limit - margin:
+                return severity, name
+            if direction == 'low' and value < limit + margin:
+                return severity, name
+        return 'normal', None
@@ -0,0 +1,230 @@
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import signal
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from .logger import _parse_size_string
+
+logger = logging.getLogger('lxpcloud_agent')
+
+# Innermost open span of the current task; asyncio tasks inherit it
+_current_span: contextvars.ContextVar = contextvars.ContextVar('lxp_current_span', default=None)
+_span_ids = itertools.count(1)
+
+class _NoopSpan:
+    """Shared span returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """One timed stage; nested spans record their parent"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'span_id', 'parent_id', 'timestamp',
+                 'start', 'duration', 'error', '_token')
+
+    def __init__(self, tracer: 'RecordingTracer', name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_span_ids)
+        self.parent_id = None
+        self.error = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is not None:
+            self.parent_id = parent.span_id
+        self._token = _current_span.set(self)
+        self.timestamp = time.time()
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.monotonic() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer.finish(self)
+        return False
+
+    def set(self, **attrs):
+        """Add attributes known only once the stage has run"""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {
+            'name': self.name,
+            'id': self.span_id,
+            'parent': self.parent_id,
+            'ts': round(self.timestamp, 6),
+            'duration_ms': round(self.duration * 1000, 3)
+        }
+        if self.attrs:
+            span['attrs'] = self.attrs
+        if self.error:
+            span['error'] = self.error
+        return span
+
+class Tracer:
+    """Default tracer: spans cost one function call and record nothing"""
+
+    enabled = False
+
+    def span(self, name: str, **attrs):
+        return NOOP_SPAN
+
+class RecordingTracer(Tracer):
+    """Tracer handing every finished span to an exporter"""
+
+    enabled = True
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def finish(self, span: Span):
+        self.exporter.export(span.to_dict())
+
+class RingBufferExporter:
+    """Keeps the most recent spans in memory for on-demand dumps"""
+
+    def __init__(self, capacity: int = 2048):
+        self._spans = deque(maxlen=capacity)
+
+    def export(self, span: Dict[str, Any]):
+        self._spans.append(span)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return list(self._spans)
+
+    def dump(self, path: str) -> int:
+        """Write the buffered spans as JSON lines; returns the span count"""
+        spans = self.snapshot()
+        with open(path, 'w') as f:
+            for span in spans:
+                f.write(json.dumps(span) + '\n')
+        return len(spans)
+
+    def close(self):
+        pass
+
+class FileExporter:
+    """
+    Appends spans to a JSON lines file, flushing every `flush_every` spans
+    The file is rotated once it reaches `max_size`, keeping `backup_count`
+    older files, like the agent's log file
+    """
+
+    def __init__(self, path: str, flush_every: int = 100,
+                 max_size: str = '10MB', backup_count: int = 1):
+        trace_dir = os.path.dirname(path)
+        if trace_dir and not os.path.exists(trace_dir):
+            try:
+                os.makedirs(trace_dir, exist_ok=True)
+            except PermissionError:
+                # Fallback to current directory if no permission
+                path = 'lxpcloud-agent-trace.jsonl'
+
+        self.path = path
+        self.flush_every = flush_every
+        self.max_bytes = _parse_size_string(str(max_size))
+        self.backup_count = backup_count
+        self._file = open(path, 'a')
+        self._size = self._file.tell()
+        self._pending = 0
+
+    def export(self, span: Dict[str, Any]):
+        line = json.dumps(span) + '\n'
+        if self._size + len(line) > self.max_bytes and self._size > 0:
+            self._rotate()
+        self._file.write(line)
+        self._size += len(line)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def _rotate(self):
+        """Shift path -> path.1 -> ... -> path.<backup_count> and start a new file"""
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self._file = open(self.path, 'a')
+        else:
+            self._file = open(self.path, 'w')
+        self._size = 0
+        self._pending = 0
+
+    def close(self):
+        self._file.close()
+
+_tracer: Tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+def set_tracer(tracer: Tracer):
+    """Install the process-wide tracer (Tracer() disables tracing)"""
+    global _tracer
+    _tracer = tracer
+
+def span(name: str, **attrs):
+    """Context manager timing a stage with the current tracer"""
+    return _tracer.span(name, **attrs)
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping a function or coroutine function in a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def install_dump_signal(exporter: RingBufferExporter, path: str):
+    """Dump the span ring buffer to `path` on SIGUSR1 (where available)"""
+    if not hasattr(signal, 'SIGUSR1'):
+        return
+
+    def handle(signum, frame):
+        try:
+            count = exporter.dump(path)
+            logger.info(f"Dumped {count} trace spans to {path}")
+        except OSError as e:
+            logger.error(f"Trace dump failed: {e}")
+
+    signal.signal(signal.SIGUSR1, handle)
@@ -0,0 +1,106 @@
+import pytest
+
+from src.core import alarm_engine
+from src.core.alarm_engine import AlarmEngine
+
+THRESHOLDS = {'warning_low': 15, 'warning_high': 35, 'critical_low': 10, 'critical_high': 40}
+
+class FakeClock:
+    """Stands in for the time module inside alarm_engine only"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(alarm_engine, 'time', fake)
+    return fake
+
+def make_engine(hysteresis=2.0, min_duration=0.0):
+    return AlarmEngine({
+        'temperature': {
+            'thresholds': THRESHOLDS,
+            'alarm': {'hysteresis': hysteresis, 'min_duration': min_duration}
+        }
+    })
+
+def feed(engine, value, status='normal'):
+    events = engine.evaluate({'temperature': {'value': value, 'status': status}})
+    return [(event['id'], event['state']) for event in events]
+
+def test_raises_on_threshold_crossing():
+    engine = make_engine()
+
+    assert feed(engine, 30) == []
+    assert feed(engine, 36) == [('TEMPERATURE_WARNING', 'raised')]
+    assert engine.active_alarms() == {'temperature': 'warning'}
+
+def test_does_not_reraise_inside_hysteresis_margin():
+    engine = make_engine()
+    feed(engine, 36)
+
+    # 33..35 is inside the 2 degree margin below warning_high
+    assert feed(engine, 34) == []
+    assert feed(engine, 33.5) == []
+    assert feed(engine, 36) == []
+    assert engine.get_stats()['raised'] == 1
+
+def test_clears_once_back_past_the_margin():
+    engine = make_engine()
+    feed(engine, 36)
+
+    assert feed(engine, 32.9) == [('TEMPERATURE_WARNING', 'cleared')]
+    assert engine.active_alarms() == {}
+    # Crossing again raises a new alarm
+    assert feed(engine, 35.5) == [('TEMPERATURE_WARNING', 'raised')]
+
+def test_escalates_from_warning_to_critical():
+    engine = make_engine()
+    feed(engine, 36)
+
+    assert feed(engine, 41) == [
+        ('TEMPERATURE_WARNING', 'cleared'),
+        ('TEMPERATURE_CRITICAL', 'raised')
+    ]
+    # Critical holds inside its own margin, then steps back down to warning
+    assert feed(engine, 39) == []
+    assert feed(engine, 37) == [
+        ('TEMPERATURE_CRITICAL', 'cleared'),
+        ('TEMPERATURE_WARNING', 'raised')
+    ]
+
+def test_low_thresholds_use_the_margin_above_the_limit():
+    engine = make_engine()
+
+    assert feed(engine, 14) == [('TEMPERATURE_WARNING', 'raised')]
+    assert feed(engine, 16) == []
+    assert feed(engine, 17.5) == [('TEMPERATURE_WARNING', 'cleared')]
+
+def test_failed_and_stale_readings_are_ignored():
+    engine = make_engine()
+    feed(engine, 36)
+
+    assert feed(engine, 20, status='stale') == []
+    assert feed(engine, 0, status='error') == []
+    assert engine.active_alarms() == {'temperature': 'warning'}
+
+def test_min_duration_debounces_transitions(clock):
+    engine = make_engine(min_duration=10.0)
+
+    assert feed(engine, 36) == []
+    clock.now += 5
+    # A short excursion back to normal resets the pending transition
+    assert feed(engine, 30) == []
+    clock.now += 5
+    assert feed(engine, 36) == []
+    clock.now += 9.9
+    assert feed(engine, 36) == []
+    clock.now += 0.1
+    assert feed(engine, 36) == [('TEMPERATURE_WARNING', 'raised')]
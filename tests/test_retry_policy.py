@@ -0,0 +1,159 @@
+import pytest
+
+from src.core import retry_policy
+from src.core.data_sender import DataSender
+from src.core.retry_policy import RetryPolicy, RetryBudget, CircuitBreaker
+
+class FakeClock:
+    """Stands in for the time module inside retry_policy only"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(retry_policy, 'time', fake)
+    return fake
+
+class FakeConnection:
+    """Connection double: every send fails until `healthy` is set"""
+
+    max_in_flight = 1
+
+    def __init__(self):
+        self.healthy = False
+        self.probes = 0
+        self.sends = 0
+
+    async def test_connection(self) -> bool:
+        self.probes += 1
+        return self.healthy
+
+    async def send_data(self, data, sequence=None) -> bool:
+        self.sends += 1
+        if not self.healthy:
+            raise ConnectionError("unreachable")
+        return True
+
+def test_backoff_stays_within_capped_exponential_bound():
+    policy = RetryPolicy({'base_delay': 1.0, 'max_delay': 5.0})
+    for attempt in range(6):
+        ceiling = min(5.0, 2 ** attempt)
+        assert all(0 <= policy.delay(attempt) <= ceiling for _ in range(50))
+
+def test_retry_budget_limits_retries_to_deposits():
+    budget = RetryBudget({'budget_ratio': 0.5, 'budget_capacity': 2.0})
+
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    assert budget.exhausted == 1
+
+    # Two first attempts deposit one retry's worth of tokens
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+def test_retry_budget_is_capped():
+    budget = RetryBudget({'budget_ratio': 1.0, 'budget_capacity': 2.0})
+    for _ in range(10):
+        budget.record_request()
+    assert budget.tokens == 2.0
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker({'failure_threshold': 3, 'reset_timeout': 10.0})
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == 10.0
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker({'failure_threshold': 2})
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_circuit_half_opens_after_reset_timeout(clock):
+    breaker = CircuitBreaker({'failure_threshold': 1, 'reset_timeout': 10.0})
+    breaker.record_failure()
+
+    clock.now += 9.9
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 0.1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.retry_after() == 0.0
+
+def test_failed_probe_doubles_the_reset_timeout(clock):
+    breaker = CircuitBreaker({'failure_threshold': 1, 'reset_timeout': 10.0,
+                              'max_reset_timeout': 30.0})
+    breaker.record_failure()
+
+    for expected in (20.0, 30.0, 30.0):
+        clock.now += breaker.reset_timeout
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_after() == expected
+
+    clock.now += breaker.reset_timeout
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.reset_timeout == 10.0
+
+@pytest.mark.asyncio
+async def test_sender_probes_half_open_circuit_before_sending(clock):
+    connection = FakeConnection()
+    sender = DataSender(connection, {
+        'max_attempts': 1,
+        'failure_threshold': 2,
+        'reset_timeout': 10.0
+    })
+
+    assert not await sender.send_data({})
+    assert not await sender.send_data({})
+    assert sender.circuit_breaker.state == CircuitBreaker.OPEN
+
+    # Open: requests are refused without touching the endpoint
+    assert not await sender.send_data({})
+    assert connection.sends == 2
+    assert connection.probes == 0
+
+    # Half-open with the endpoint still down: one probe, no send
+    clock.now += 10.0
+    assert not await sender.send_data({})
+    assert (connection.probes, connection.sends) == (1, 2)
+    assert sender.circuit_breaker.state == CircuitBreaker.OPEN
+
+    # Half-open with the endpoint back: probe succeeds and the send goes out
+    connection.healthy = True
+    clock.now += sender.circuit_breaker.reset_timeout
+    assert await sender.send_data({})
+    assert (connection.probes, connection.sends) == (2, 3)
+    assert sender.circuit_breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_sender_stops_retrying_when_budget_is_exhausted(clock):
+    connection = FakeConnection()
+    sender = DataSender(connection, {
+        'max_attempts': 5,
+        'base_delay': 0.0,
+        'max_delay': 0.0,
+        'budget_ratio': 0.0,
+        'budget_capacity': 1.0,
+        'failure_threshold': 100
+    })
+
+    assert not await sender.send_data({})
+    # First attempt plus the single retry the budget allows
+    assert connection.sends == 2
+    assert sender.retry_budget.exhausted == 1
@@ -0,0 +1,119 @@
+from src.core.storage import PersistentQueue
+
+def make_queue(tmp_path, **config):
+    config.setdefault('path', str(tmp_path / 'buffer.db'))
+    return PersistentQueue(config)
+
+def record(index, padding=0):
+    return {'index': index, 'padding': 'x' * padding}
+
+def test_records_survive_reopen(tmp_path):
+    queue = make_queue(tmp_path)
+    for index in range(3):
+        assert queue.put(record(index))
+    queue.close()
+
+    reopened = make_queue(tmp_path)
+    assert len(reopened) == 3
+    assert [data['index'] for _, data in reopened.peek(10)] == [0, 1, 2]
+    assert reopened.size_bytes == queue.size_bytes
+    reopened.close()
+
+def test_uncommitted_writes_are_flushed_on_close(tmp_path):
+    queue = make_queue(tmp_path, sync_batch=1000, sync_interval=3600)
+    queue.put(record(0))
+    queue.close()
+
+    reopened = make_queue(tmp_path)
+    assert len(reopened) == 1
+    reopened.close()
+
+def test_ack_removes_only_acknowledged_records(tmp_path):
+    queue = make_queue(tmp_path)
+    for index in range(4):
+        queue.put(record(index))
+    ids = [record_id for record_id, _ in queue.peek(10)]
+
+    queue.ack([ids[0], ids[2]])
+    queue.close()
+
+    reopened = make_queue(tmp_path)
+    assert [record_id for record_id, _ in reopened.peek(10)] == [ids[1], ids[3]]
+    assert reopened.get_stats()['records'] == 2
+    reopened.close()
+
+def test_acks_are_durable_across_commits(tmp_path):
+    queue = make_queue(tmp_path, sync_batch=1)
+    for index in range(3):
+        queue.put(record(index))
+    first_id = queue.peek(1)[0][0]
+    queue.ack([first_id])
+    # Simulate a crash: the connection goes away without close()
+    queue._conn.close()
+
+    reopened = make_queue(tmp_path)
+    assert first_id not in [record_id for record_id, _ in reopened.peek(10)]
+    assert len(reopened) == 2
+    reopened.close()
+
+def test_drop_oldest_evicts_under_max_size(tmp_path):
+    queue = make_queue(tmp_path, max_size='2KB', eviction='drop_oldest')
+    for index in range(100):
+        assert queue.put(record(index, padding=80))
+
+    assert queue.size_bytes <= queue.max_bytes
+    # Only enough records to fit each new one are evicted, so the buffer stays full
+    record_size = queue.size_bytes // len(queue)
+    assert queue.size_bytes + record_size > queue.max_bytes
+    stats = queue.get_stats()
+    assert stats['evicted'] > 0
+    assert stats['records'] + stats['evicted'] == 100
+    # The newest records are kept, in order
+    indexes = [data['index'] for _, data in queue.peek(1000)]
+    assert indexes == list(range(100 - len(indexes), 100))
+    queue.close()
+
+def test_drop_newest_rejects_when_full(tmp_path):
+    queue = make_queue(tmp_path, max_size='1KB', eviction='drop_newest')
+    accepted = [queue.put(record(index, padding=80)) for index in range(50)]
+
+    assert not all(accepted)
+    assert queue.get_stats()['rejected'] == accepted.count(False)
+    assert [data['index'] for _, data in queue.peek(1000)] == list(range(accepted.count(True)))
+    queue.close()
+
+def test_max_records_limit(tmp_path):
+    queue = make_queue(tmp_path, max_records=5)
+    for index in range(12):
+        queue.put(record(index))
+
+    assert len(queue) == 5
+    assert [data['index'] for _, data in queue.peek(1000)] == list(range(7, 12))
+    assert queue.get_stats()['evicted'] == 7
+    queue.close()
+
+def test_oversized_record_is_rejected(tmp_path):
+    queue = make_queue(tmp_path, max_size='1KB')
+
+    assert not queue.put(record(0, padding=2048))
+    assert len(queue) == 0
+    queue.close()
+
+def test_rejected_records_move_to_dead_letters(tmp_path):
+    queue = make_queue(tmp_path, max_rejections=2)
+    queue.put(record(0))
+    queue.put(record(1))
+    ids = [record_id for record_id, _ in queue.peek(10)]
+
+    assert queue.reject([ids[0]]) == 0
+    assert queue.reject([ids[0]]) == 1
+
+    assert [record_id for record_id, _ in queue.peek(10)] == [ids[1]]
+    assert queue.dead_letters()[0]['record'] == record(0)
+    assert queue.get_stats()['dead_lettered'] == 1
+    queue.close()
+
+    reopened = make_queue(tmp_path)
+    assert len(reopened) == 1
+    assert len(reopened.dead_letters()) == 1
+    reopened.close()